@@ -2,11 +2,22 @@
 
 from generator.entry_json import write_entry_jsons
 from generator.manifest import create_or_update
-from generator.zip_handler import pick_zip_path, unzip_to_folder
+from generator.zip_handler import (
+    extract_if_changed,
+    find_export_json,
+    find_import_dir,
+    import_subdirs,
+    pick_zip_path,
+    unzip_to_folder,
+)
 
 __all__ = [
     "write_entry_jsons",
     "create_or_update",
+    "extract_if_changed",
+    "find_export_json",
+    "find_import_dir",
+    "import_subdirs",
     "pick_zip_path",
     "unzip_to_folder",
 ]
@@ -1,15 +1,31 @@
 """Shared date parsing and archive path logic for Day One entries."""
 
-import json
-from collections import defaultdict
-from datetime import datetime
+import os
+import sys
+from collections.abc import Collection, Iterable, Iterator
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+from generator.entry_helpers import parse_iso_datetime
+from generator.json_cache import load_manifest
+
 
 def parse_date(date_str: str) -> str:
     """Extract YYYY-MM-DD from ISO 8601 date string (UTC)."""
-    return date_str[:10] if date_str else ""
+    return sys.intern(date_str[:10]) if date_str else ""
+
+
+_UTC = ZoneInfo("UTC")
+
+
+@lru_cache(maxsize=256)
+def _zone(timezone_name: str) -> ZoneInfo | None:
+    """Return the ZoneInfo for a name, or None if invalid (bad names are memoized too)."""
+    try:
+        return ZoneInfo(timezone_name)
+    except Exception:
+        return None
 
 
 def _creation_date_local_yyyy_mm_dd(creation_date: str, timezone_name: str | None) -> str:
@@ -21,15 +37,17 @@ def _creation_date_local_yyyy_mm_dd(creation_date: str, timezone_name: str | Non
         return ""
     if not timezone_name:
         return parse_date(creation_date)
+    # Day One stores creationDate in UTC ("...Z"), so a UTC zone needs no conversion.
+    if timezone_name == "UTC" and creation_date.endswith("Z"):
+        return parse_date(creation_date)
+    tz = _zone(timezone_name)
+    if tz is None:
+        # Invalid timezone name, fall back to UTC
+        return parse_date(creation_date)
     try:
-        dt = datetime.fromisoformat(creation_date.replace("Z", "+00:00"))
+        dt = parse_iso_datetime(creation_date)
         if not dt.tzinfo:
-            dt = dt.replace(tzinfo=ZoneInfo("UTC"))
-        try:
-            tz = ZoneInfo(timezone_name)
-        except Exception:
-            # Invalid timezone name, fall back to UTC
-            return parse_date(creation_date)
+            dt = dt.replace(tzinfo=_UTC)
         local = dt.astimezone(tz)
         return local.strftime("%Y-%m-%d")
     except Exception:
@@ -37,62 +55,238 @@ def _creation_date_local_yyyy_mm_dd(creation_date: str, timezone_name: str | Non
         return parse_date(creation_date)
 
 
+def sort_by_creation_date(entries: list[dict]) -> list[dict]:
+    """
+    Return Day One entries ordered by creationDate (earliest first), stable for ties.
+    Keys are pulled out once up front so the sort itself compares plain strings in C.
+    """
+    keys = [entry.get("creationDate", "") for entry in entries]
+    order = sorted(range(len(entries)), key=keys.__getitem__)
+    return [entries[i] for i in order]
+
+
 def assign_date_keys(entries_sorted: list[dict]) -> list[tuple[str, dict]]:
     """Build (date_key, entry) for each entry, ordered earliest first."""
     result: list[tuple[str, dict]] = []
-    counts: dict[str, int] = defaultdict(int)
+    append = result.append
+    counts: dict[str, int] = {}
+    counts_get = counts.get
+    intern = sys.intern
+    local_date = _creation_date_local_yyyy_mm_dd
 
     for entry in entries_sorted:
-        creation_date = entry.get("creationDate", "")
-        tz_name = (entry.get("location") or {}).get("timeZoneName")
-        date_part = _creation_date_local_yyyy_mm_dd(creation_date, tz_name)
-        count = counts[date_part]
-        counts[date_part] += 1
+        creation_date = entry.get("creationDate") or ""
+        location = entry.get("location")
+        tz_name = location.get("timeZoneName") if location else None
+        # Entries without a timezone use the UTC date; slice it inline. Date parts
+        # repeat across entries, so intern them to make key lookups pointer checks.
+        if tz_name:
+            date_part = intern(local_date(creation_date, tz_name))
+        else:
+            date_part = intern(creation_date[:10])
+        count = counts_get(date_part, 0)
+        counts[date_part] = count + 1
 
-        date_key = date_part if count == 0 else f"{date_part}_{count}"
-        result.append((date_key, entry))
+        append((date_part if count == 0 else intern(f"{date_part}_{count}"), entry))
 
     return result
 
 
+def _year_month_for_date_key(date_key: str) -> tuple[str, str] | None:
+    """Return (year, month) from a date key like 2026-02-03 or 2026-02-03_1, or None."""
+    if len(date_key) >= 10 and date_key[4] == "-" and date_key[7] == "-" and "_" not in date_key[:8]:
+        return date_key[:4], date_key[5:7]
+    # Unusual keys: fall back to splitting so behaviour matches the canonical form.
+    parts = date_key.partition("_")[0].split("-")
+    if len(parts) >= 2:
+        return parts[0], parts[1]
+    return None
+
+
+def year_month_for_date_key(date_key: str) -> tuple[str, str]:
+    """Return (year, month) strings for a date key; ("0000", "00") if it has no date."""
+    return _year_month_for_date_key(date_key) or ("0000", "00")
+
+
+@lru_cache(maxsize=None)
 def html_path_for_date_key(date_key: str) -> str:
     """Return the relative HTML path for an entry (e.g. 2026/02/2026-02-03.html)."""
-    date_part = date_key.split("_")[0]
-    parts = date_part.split("-")
-    if len(parts) >= 2:
-        year, month = parts[0], parts[1]
+    year_month = _year_month_for_date_key(date_key)
+    if year_month:
+        year, month = year_month
         return f"{year}/{month}/{date_key}.html"
     return f"{date_key}.html"
 
 
+@lru_cache(maxsize=None)
 def output_dir_for_date_key(archive_entries_dir: Path, date_key: str) -> Path:
     """Return the output directory for an entry (e.g. archive/entries/2026/02/)."""
-    date_part = date_key.split("_")[0]
-    parts = date_part.split("-")
-    year, month = (parts[0], parts[1]) if len(parts) >= 2 else ("0000", "00")
+    year, month = year_month_for_date_key(date_key)
     return archive_entries_dir / year / month
 
 
-def prev_next_map(manifest_path: Path) -> dict[str, tuple[str | None, str | None]]:
-    """Return a mapping of date_key -> (prev_key, next_key) from a manifest."""
-    if not manifest_path.exists():
-        return {}
+def build_key_table(
+    date_keys: list[str], archive_entries_dir: Path
+) -> list[tuple[str, str, str, Path, Path]]:
+    """
+    Resolve each date key's paths once: (date_key, year, month, json_path, html_path).
+    Lets hot loops iterate plain tuples instead of re-deriving paths per key.
+    """
+    table: list[tuple[str, str, str, Path, Path]] = []
+    for date_key in date_keys:
+        year, month = year_month_for_date_key(date_key)
+        entry_dir = output_dir_for_date_key(archive_entries_dir, date_key)
+        table.append((
+            date_key,
+            year,
+            month,
+            entry_dir / f"{date_key}.json",
+            entry_dir / f"{date_key}.html",
+        ))
+    return table
+
 
-    with open(manifest_path, encoding="utf-8") as f:
-        data = json.load(f)
+def existing_entry_json_names(archive_entries_dir: Path, date_keys: Iterable[str]) -> set[str]:
+    """
+    Return the names of entry JSON files present in the YYYY/MM folders of date_keys.
+    One scandir per month folder replaces a stat() per entry.
+    """
+    names: set[str] = set()
+    for entry_dir in {output_dir_for_date_key(archive_entries_dir, k) for k in date_keys}:
+        try:
+            with os.scandir(entry_dir) as it:
+                names.update(e.name for e in it if e.name.endswith(".json") and e.is_file())
+        except OSError:
+            continue
+    return names
 
-    entries = data.get("entries", [])
+
+def iter_json_files(root: str | Path, skip_dirs: Collection[str] = ()) -> Iterator[os.DirEntry]:
+    """
+    Yield a DirEntry for every *.json file under root, in Path.rglob("*.json") order
+    (a folder's files first, then its subfolders). Folders named in skip_dirs are not
+    entered. File types come from the directory read, so no per-file stat() is needed.
+    """
+    try:
+        with os.scandir(root) as it:
+            dir_entries = list(it)
+    except OSError:
+        return
+    subdirs: list[str] = []
+    for e in dir_entries:
+        if e.is_dir(follow_symlinks=False):
+            if e.name not in skip_dirs:
+                subdirs.append(e.path)
+        elif e.name.endswith(".json"):
+            yield e
+    for subdir in subdirs:
+        yield from iter_json_files(subdir, skip_dirs)
+
+
+def entry_json_files(entries_dir: str | Path) -> list[os.DirEntry]:
+    """
+    Return every *.json file under entries_dir except the generated on-this-day pages.
+    A build can take this list once and hand it to each stage that scans the entries
+    (On This Day, map), so the archive tree is walked only once.
+    """
+    return list(iter_json_files(entries_dir, skip_dirs={"on-this-day"}))
+
+
+def keys_from_entries(entries: list) -> list[str]:
+    """Return the date keys of manifest rows, in manifest order."""
     # Row format: [uuid, date_key, html_path, creation_date] or legacy [date_key, html_path, creation_date]
-    keys: list[str] = [
-        row[1] if len(row) >= 4 else row[0]
+    intern = sys.intern
+    return [
+        intern(row[1] if len(row) >= 4 else row[0])
         for row in entries
         if isinstance(row, list) and row
     ]
 
-    prev_next: dict[str, tuple[str | None, str | None]] = {}
+
+def _all_neighbors(keys: list[str]) -> dict[str, list[tuple[str | None, str | None]]]:
+    """Return key -> [(prev, next), ...] for every occurrence of the key, in order."""
+    last = len(keys) - 1
+    neighbors: dict[str, list[tuple[str | None, str | None]]] = {}
     for i, key in enumerate(keys):
-        prev_key = keys[i - 1] if i > 0 else None
-        next_key = keys[i + 1] if i + 1 < len(keys) else None
-        prev_next[key] = (prev_key, next_key)
+        neighbors.setdefault(key, []).append((
+            keys[i - 1] if i > 0 else None,
+            keys[i + 1] if i < last else None,
+        ))
+    return neighbors
+
+
+def neighbors_changed(old_keys: list[str], new_keys: list[str], imported: set[str]) -> set[str]:
+    """
+    Return keys in new_keys (other than imported ones) whose prev/next differ from old_keys.
+
+    With unique keys, keys that were not imported keep their relative order, so only a
+    key that sat next to an imported or dropped key, before or after the merge, can
+    change; neighbors are read by index arithmetic on the two ordered key lists.
+    Duplicate date keys (an entry on a day an earlier import already covered) break
+    that assumption, so then every key's neighbors are compared in full.
+    """
+    if len(set(old_keys)) != len(old_keys) or len(set(new_keys)) != len(new_keys):
+        old_neighbors = _all_neighbors(old_keys)
+        return {
+            key
+            for key, pairs in _all_neighbors(new_keys).items()
+            if key not in imported and pairs != old_neighbors.get(key, [(None, None)])
+        }
+
+    old_index = {key: i for i, key in enumerate(old_keys)}
+    new_index = {key: i for i, key in enumerate(new_keys)}
+    old_last = len(old_keys) - 1
+    new_last = len(new_keys) - 1
+
+    candidates: set[str] = set()
+    for key in imported | (old_index.keys() - new_index.keys()):
+        i = old_index.get(key)
+        if i is not None:
+            if i > 0:
+                candidates.add(old_keys[i - 1])
+            if i < old_last:
+                candidates.add(old_keys[i + 1])
+        i = new_index.get(key)
+        if i is not None:
+            if i > 0:
+                candidates.add(new_keys[i - 1])
+            if i < new_last:
+                candidates.add(new_keys[i + 1])
+
+    changed: set[str] = set()
+    for key in candidates - imported:
+        i = new_index.get(key)
+        if i is None:
+            continue
+        j = old_index.get(key)
+        new_prev = new_keys[i - 1] if i > 0 else None
+        new_next = new_keys[i + 1] if i < new_last else None
+        if j is None:
+            if new_prev is not None or new_next is not None:
+                changed.add(key)
+            continue
+        old_prev = old_keys[j - 1] if j > 0 else None
+        old_next = old_keys[j + 1] if j < old_last else None
+        if (old_prev, old_next) != (new_prev, new_next):
+            changed.add(key)
+    return changed
+
+
+@lru_cache(maxsize=4)
+def _manifest_keys_cached(manifest_path: str, mtime_ns: int, size: int) -> list[str]:
+    """Parse the manifest once per (path, mtime, size); see manifest_keys."""
+    data = load_manifest(manifest_path)
+    return keys_from_entries(data.get("entries", []))
+
+
+def manifest_keys(manifest_path: Path) -> list[str]:
+    """
+    Return the manifest's date keys in order (empty if the manifest is missing).
+    Results are memoized by file mtime and size, so treat the returned list as read-only.
+    """
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return []
 
-    return prev_next
+    st = manifest_path.stat()
+    return _manifest_keys_cached(str(manifest_path), st.st_mtime_ns, st.st_size)
@@ -3,28 +3,70 @@
 from __future__ import annotations
 
 import calendar
-import json
-from datetime import datetime
+import os
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
-
-from generator.entry_html import _load_manifest_full
-from generator.index_html import _year_range_from_manifest
+from generator.archive_paths import _year_month_for_date_key, existing_entry_json_names
+from generator.entry_helpers import _format_12h, _format_month_year, parse_iso_datetime
+from generator.index_html import _year_range
+from generator.jinja_env import get_template
+from generator.json_cache import load_entry, map_entries
+from generator.manifest import first_photos_from_manifest, load_manifest_rows
 from generator.nav_context import tab_urls_for_root
 from generator.text_to_html import get_first_photo_filename
 
 
+@lru_cache(maxsize=None)
+def _empty_month_cells(lead_empty: int, ndays: int) -> tuple[dict, ...]:
+    """Cells for a month without entries: lead padding, then one empty cell per day."""
+    pad = ({"empty": True},) * lead_empty
+    days = tuple({"day": day, "state": "empty", "empty": False} for day in range(1, ndays + 1))
+    return pad + days
+
+
+def _calendar_entry_label(creation: str) -> str:
+    """Time label for a calendar entry link (e.g. 3:06 PM)."""
+    if not creation:
+        return "Entry"
+    try:
+        return _format_12h(parse_iso_datetime(creation))
+    except (ValueError, TypeError):
+        return creation[11:16] if len(creation) >= 16 else "Entry"
+
+
+def _calendar_entry_label_and_photo(
+    entry_json_path: str, photos_dir: Path, import_dir: Path
+) -> tuple[str, str | None]:
+    """Return (time label, first photo filename or None) for one entry JSON."""
+    entry = load_entry(entry_json_path)
+    label = _calendar_entry_label(entry.get("creationDate", ""))
+    return label, get_first_photo_filename(entry, import_dir, photos_dir)
+
+
+def _map_calendar_entries(
+    jobs: list[tuple[str, str, Path]], import_dir: Path
+) -> dict[str, tuple[str, str | None]]:
+    """
+    Load label/first photo for each (date_key, entry JSON path, photos dir) job,
+    using threads for larger archives. Returns date_key -> (label, first photo).
+    """
+    results = map_entries(lambda job: _calendar_entry_label_and_photo(job[1], job[2], import_dir), jobs)
+    return {job[0]: result for job, result in zip(jobs, results)}
+
+
 def _build_calendar_data(
     manifest_path: Path,
+    manifest_full: list[tuple[str, str, str]],
     entries_dir: Path,
     import_dir: Path,
 ) -> dict:
     """
     Build calendar data: years with months, each month a 7-column grid of cells.
     Each cell: empty (pad), or {day, state: 'empty'|'entry'|'photo', single_url?, entries?, thumbnail_url?}.
+    manifest_full holds the already-loaded manifest rows; manifest_path supplies recorded first photos.
     """
-    manifest_full = _load_manifest_full(manifest_path)
     if not manifest_full:
         return {"weekdays": ["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"], "years": []}
 
@@ -34,47 +76,67 @@ def _build_calendar_data(
     # Group by date (YYYY-MM-DD); each date has list of (date_key, html_path, creation_date)
     by_date: dict[str, list[tuple[str, str, str]]] = {}
     for date_key, html_path, creation_date in manifest_full:
-        date_part = date_key.split("_")[0]
+        date_part = date_key.partition("_")[0]
         if len(date_part) < 10:
             continue
         by_date.setdefault(date_part, []).append((date_key, html_path, creation_date))
 
-    # For each date, load entry JSONs and get first photo for first entry (by creation order)
-    date_info: dict[str, dict] = {}  # date_part -> {state, single_url?, entries: [{url, label}], thumbnail_url?}
+    # Dates grouped by (year, month), so per-month paths are built once per month.
+    by_month: dict[tuple[str, str], list[tuple[str, list[tuple[str, str, str]]]]] = {}
     for date_part, row_list in by_date.items():
-        parts = date_part.split("-")
-        year, month = (parts[0], parts[1]) if len(parts) >= 2 else ("00", "00")
-        entries_for_day: list[dict] = []
-        thumbnail_url: str | None = None
-        for date_key, html_path, creation_date in row_list:
-            entry_url = f"entries/{html_path}"
-            entry_json_path = entries_dir / year / month / f"{date_key}.json"
-            label = "Entry"
-            first_photo = None
-            if entry_json_path.exists():
-                with open(entry_json_path, encoding="utf-8") as f:
-                    entry = json.load(f)
-                creation = entry.get("creationDate", "")
-                if creation:
-                    try:
-                        dt = datetime.fromisoformat(creation.replace("Z", "+00:00"))
-                        s = dt.strftime("%I:%M %p")
-                        label = s[1:] if len(s) > 0 and s[0] == "0" else s  # 3:06 PM not 03:06 PM
-                    except (ValueError, TypeError):
-                        label = creation[11:16] if len(creation) >= 16 else "Entry"
-                photos_dir = entry_json_path.parent / "photos"
-                first_photo = get_first_photo_filename(entry, import_dir, photos_dir)
+        year_month = _year_month_for_date_key(date_part) or ("00", "00")
+        by_month.setdefault(year_month, []).append((date_part, row_list))
+
+    # Which entry JSONs exist, from one directory scan per month instead of a stat per entry.
+    existing_jsons = existing_entry_json_names(
+        entries_dir, [date_key for rows in by_date.values() for date_key, _, _ in rows]
+    )
+
+    # Entries whose page generation recorded a first photo in the manifest need no
+    # JSON read: the label comes from the manifest creation date. A date_key listed
+    # more than once (stale rows from re-imports) shares one JSON, so read it instead.
+    recorded_photos = first_photos_from_manifest(manifest_path)
+    key_counts = Counter(date_key for date_key, _, _ in manifest_full)
+    loaded: dict[str, tuple[str, str | None]] = {}
+
+    # Load the remaining (older) entry JSONs up front. Each load is file I/O plus a
+    # parse, so a thread pool overlaps them.
+    jobs: list[tuple[str, str, Path]] = []
+    for (year, month), days in by_month.items():
+        month_dir = os.path.join(entries_dir, year, month)
+        photos_dir = Path(month_dir, "photos")
+        for _, row_list in days:
+            for date_key, _, creation_date in row_list:
+                name = f"{date_key}.json"
+                if name not in existing_jsons:
+                    continue
+                if date_key in recorded_photos and key_counts[date_key] == 1:
+                    loaded[date_key] = (_calendar_entry_label(creation_date), recorded_photos[date_key])
+                else:
+                    jobs.append((date_key, os.path.join(month_dir, name), photos_dir))
+    loaded.update(_map_calendar_entries(jobs, import_dir))
+
+    # For each date, get labels and first photo for first entry (by creation order)
+    date_info: dict[str, dict] = {}  # date_part -> {state, single_url?, entries: [{url, label}], thumbnail_url?}
+    for (year, month), days in by_month.items():
+        photos_prefix = f"entries/{year}/{month}/photos/"
+        for date_part, row_list in days:
+            entries_for_day: list[dict] = []
+            thumbnail_url: str | None = None
+            for date_key, html_path, creation_date in row_list:
+                entry_url = f"entries/{html_path}"
+                label, first_photo = loaded.get(date_key, ("Entry", None))
                 if first_photo and thumbnail_url is None:
-                    thumbnail_url = f"entries/{year}/{month}/photos/{first_photo}"
-            entries_for_day.append({"url": entry_url, "label": label})
+                    thumbnail_url = f"{photos_prefix}{first_photo}"
+                entries_for_day.append({"url": entry_url, "label": label})
 
-        has_photo = thumbnail_url is not None
-        date_info[date_part] = {
-            "state": "photo" if has_photo else "entry",
-            "single_url": entries_for_day[0]["url"] if len(entries_for_day) == 1 else None,
-            "entries": entries_for_day,
-            "thumbnail_url": thumbnail_url,
-        }
+            has_photo = thumbnail_url is not None
+            date_info[date_part] = {
+                "state": "photo" if has_photo else "entry",
+                "single_url": entries_for_day[0]["url"] if len(entries_for_day) == 1 else None,
+                "entries": entries_for_day,
+                "thumbnail_url": thumbnail_url,
+            }
 
     # Year range: include full years that have at least one entry
     years_with_entries: set[int] = set()
@@ -91,16 +153,25 @@ def _build_calendar_data(
     max_year = max(years_with_entries)
     calendar.setfirstweekday(calendar.SUNDAY)
 
+    # Most months in a long journal have no entries; their grids are shared.
+    months_with_entries = {date_part[:7] for date_part in date_info}
+
     years_data: list[dict] = []
     for year in range(min_year, max_year + 1):
         months_data: list[dict] = []
-        for month in range(1, 13):
-            first_weekday, ndays = calendar.monthrange(year, month)
+        month_ranges = [calendar.monthrange(year, month) for month in range(1, 13)]
+        for month, (first_weekday, ndays) in enumerate(month_ranges, start=1):
             # first_weekday: 0=Monday in default; we set SUNDAY so 0=Sunday
             lead_empty = first_weekday  # number of cells before day 1
-            cells: list[dict] = []
-            for _ in range(lead_empty):
-                cells.append({"empty": True})
+            if f"{year}-{month:02d}" not in months_with_entries:
+                months_data.append({
+                    "title": _format_month_year(year, month),
+                    "year": year,
+                    "month": month,
+                    "cells": _empty_month_cells(lead_empty, ndays),
+                })
+                continue
+            cells: list[dict] = [{"empty": True} for _ in range(lead_empty)]
             for day in range(1, ndays + 1):
                 date_part = f"{year}-{month:02d}-{day:02d}"
                 info = date_info.get(date_part)
@@ -114,11 +185,10 @@ def _build_calendar_data(
                         "empty": False,
                         "single_url": info.get("single_url"),
                         "entries": entries,
-                        "entries_json": json.dumps(entries) if entries else "[]",
                         "thumbnail_url": info.get("thumbnail_url"),
                     })
             months_data.append({
-                "title": datetime(year, month, 1).strftime("%B %Y"),
+                "title": _format_month_year(year, month),
                 "year": year,
                 "month": month,
                 "cells": cells,
@@ -145,12 +215,11 @@ def generate_calendar_html(
     if not manifest_path.exists():
         return
 
-    calendar_data = _build_calendar_data(manifest_path, entries_dir, import_dir)
-    year_range = _year_range_from_manifest(manifest_path)
+    manifest_full = load_manifest_rows(manifest_path)
+    calendar_data = _build_calendar_data(manifest_path, manifest_full, entries_dir, import_dir)
+    year_range = _year_range(manifest_full)
 
-    templates_dir = Path(__file__).resolve().parent / "templates"
-    env = Environment(loader=FileSystemLoader(templates_dir))
-    template = env.get_template("calendar.html")
+    template = get_template("calendar.html")
     tab_urls = tab_urls_for_root()
     context = {
         "css_path": "assets/css/",
@@ -165,4 +234,4 @@ def generate_calendar_html(
     html = template.render(context)
     calendar_path = archive_root / "calendar.html"
     calendar_path.parent.mkdir(parents=True, exist_ok=True)
-    calendar_path.write_text(html, encoding="utf-8")
+    calendar_path.write_bytes(html.encode("utf-8"))
@@ -1,25 +1,31 @@
 """Extract entry metadata from Day One entry dicts for HTML generation."""
 
 import re
+import sys
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Final, Mapping
+
+# Compiled once; index_snippet and get_title run for every entry on every page build.
+_TITLE_DISALLOWED_RE = re.compile(r'[\\/:\*?"<>|#^\[\]]')
+_MARKDOWN_ESCAPE_RE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!])")
+
+# Location fields joined (in this order) for the human-readable location string.
+_LOCATION_KEYS = ("userLabel", "placeName", "localityName", "administrativeArea", "country")
+# Shared stand-in for entries without a location, so helpers need a single lookup.
+_EMPTY_LOCATION: Mapping[str, str] = MappingProxyType({})
 
 
 def get_location(entry: dict) -> str:
     """Extract a human-readable location string from a Day One entry."""
-    if "location" not in entry:
-        return ""
-
-    locations: list[str] = []
-    for key in ["userLabel", "placeName", "localityName", "administrativeArea", "country"]:
-        if key in entry["location"]:
-            locations.append(entry["location"][key])
-    return ", ".join(locations)
+    loc = entry.get("location") or _EMPTY_LOCATION
+    return ", ".join([loc[key] for key in _LOCATION_KEYS if key in loc])
 
 
 def get_coordinates(entry: dict) -> str:
     """Extract latitude,longitude from a Day One entry location."""
-    if "location" not in entry:
-        return ""
-    loc = entry["location"]
+    loc = entry.get("location") or _EMPTY_LOCATION
     if "latitude" not in loc or "longitude" not in loc:
         return ""
     return f"{loc['latitude']},{loc['longitude']}"
@@ -58,28 +64,24 @@ def get_weather(entry: dict) -> str:
 
 def get_place_name(entry: dict) -> str:
     """Extract placeName from entry location."""
-    if "location" not in entry or "placeName" not in entry["location"]:
-        return ""
-    name = entry["location"]["placeName"] or ""
-    return name
+    loc = entry.get("location") or _EMPTY_LOCATION
+    return loc.get("placeName") or ""
 
 
 def get_locality_name(entry: dict) -> str:
     """Extract localityName from entry location."""
-    if "location" not in entry or "localityName" not in entry["location"]:
-        return ""
-    return entry["location"]["localityName"] or ""
+    loc = entry.get("location") or _EMPTY_LOCATION
+    return loc.get("localityName") or ""
 
 
 def get_country(entry: dict) -> str:
     """Extract country from entry location."""
-    if "location" not in entry or "country" not in entry["location"]:
-        return ""
-    return entry["location"]["country"]
+    loc = entry.get("location") or _EMPTY_LOCATION
+    return loc.get("country", "")
 
 
-# Weather code -> emoji (Day One weatherCode values)
-WEATHER_EMOJI: dict[str, str] = {
+# Weather code -> emoji (Day One weatherCode values); read-only
+WEATHER_EMOJI: Final[Mapping[str, str]] = MappingProxyType({
     "clear": "☀️",
     "mostly-clear": "🌤️",
     "partly-cloudy": "⛅",
@@ -97,10 +99,10 @@ WEATHER_EMOJI: dict[str, str] = {
     "thunderstorm": "⛈️",
     "tornado": "🌪️",
     "hurricane": "🌀",
-}
+})
 
-# Moon phase code -> emoji
-MOON_EMOJI: dict[str, str] = {
+# Moon phase code -> emoji; read-only
+MOON_EMOJI: Final[Mapping[str, str]] = MappingProxyType({
     "new": "🌑",
     "waxing-crescent": "🌒",
     "first-quarter": "🌓",
@@ -109,7 +111,7 @@ MOON_EMOJI: dict[str, str] = {
     "waning-gibbous": "🌖",
     "last-quarter": "🌗",
     "waning-crescent": "🌘",
-}
+})
 
 
 def get_weather_emoji(entry: dict) -> str:
@@ -145,20 +147,46 @@ def get_tags(
     tag_prefix: str = "",
 ) -> str:
     """Extract tags as a comma-separated string. Includes starred if applicable."""
-    tag_list: list[str] = list(additional_tags or [])
+    # Most entries have no tags at all; skip building the list for them.
+    if "tags" not in entry:
+        return ", ".join(additional_tags) if additional_tags else ""
 
-    if "tags" in entry:
-        for t in entry["tags"]:
-            if not t:
-                continue
-            normalized = t.replace(" ", "-").replace("---", "-")
-            tag_list.append(f"{tag_prefix}{normalized}")
-        if entry.get("starred"):
-            tag_list.append(f"{tag_prefix}starred")
+    tag_list: list[str] = list(additional_tags or [])
+    append = tag_list.append
+    for t in entry["tags"]:
+        if not t:
+            continue
+        normalized = t.replace(" ", "-")
+        if "---" in normalized:
+            normalized = normalized.replace("---", "-")
+        append(f"{tag_prefix}{normalized}" if tag_prefix else normalized)
+    if entry.get("starred"):
+        append(f"{tag_prefix}starred")
 
     return ", ".join(tag_list) if tag_list else ""
 
 
+def _iter_lines(text: str):
+    """Yield the "\n"-separated lines of text lazily, so callers can stop early."""
+    start = 0
+    find = text.find
+    while True:
+        end = find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _unescape_markdown(s: str) -> str:
+    """Strip Markdown backslash escapes (e.g. '\\.' -> '.')."""
+    # Most lines have no backslash at all; a substring test is far cheaper than the regex.
+    if "\\" not in s:
+        return s
+    return _MARKDOWN_ESCAPE_RE.sub(r"\1", s)
+
+
 def index_snippet(entry: dict, max_len: int = 160) -> str:
     """
     Build a short snippet for the index/map from the first few
@@ -166,10 +194,8 @@ def index_snippet(entry: dict, max_len: int = 160) -> str:
     Also strips simple Markdown-style backslash escapes so that
     sequences like '\\.' render as '.'.
     """
-    def _unescape_markdown(s: str) -> str:
-        return re.sub(r"\\([\\`*_{}\[\]()#+\-.!])", r"\1", s)
-
-    text = _unescape_markdown((entry.get("text") or "").strip())
+    # Escapes never span lines, so only the lines actually used are unescaped.
+    text = (entry.get("text") or "").strip()
     if not text:
         raw = get_title(entry)
         if not raw:
@@ -180,17 +206,20 @@ def index_snippet(entry: dict, max_len: int = 160) -> str:
         return raw[: max_len - 1].rstrip() + "…"
 
     lines: list[str] = []
-    for line in text.split("\n"):
-        candidate = line.strip()
+    joined_len = -1  # length of " ".join(lines)
+    for line in _iter_lines(text):
+        candidate = _unescape_markdown(line).strip()
         if not candidate:
             continue
-        if re.match(r"!\[\]", candidate):
+        if candidate.startswith("![]"):
             continue
-        if re.search(r"^#+\s*", candidate) and not candidate.startswith("# ["):
-            candidate = re.sub(r"^#+\s*", "", candidate)
+        if candidate.startswith("#") and not candidate.startswith("# ["):
+            candidate = candidate.lstrip("#").lstrip()
         if candidate:
             lines.append(candidate)
-        if len(lines) >= 3:
+            joined_len += len(candidate) + 1
+        # Past max_len the snippet is truncated anyway, so later lines cannot change it.
+        if len(lines) >= 3 or joined_len > max_len:
             break
 
     if not lines:
@@ -202,17 +231,52 @@ def index_snippet(entry: dict, max_len: int = 160) -> str:
     return snippet[: max_len - 1].rstrip() + "…"
 
 
+# Python 3.11+ parses a trailing "Z" natively; 3.10 needs it spelled as "+00:00".
+if sys.version_info >= (3, 11):
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+@lru_cache(maxsize=8192)
+def parse_iso_datetime(value: str) -> datetime:
+    """
+    Parse a Day One ISO 8601 timestamp (trailing "Z" allowed on every Python version).
+    Memoized because each stage parses the same creationDate strings again.
+    """
+    return _fromisoformat(value)
+
+
+def _format_12h(dt: datetime) -> str:
+    """Format a time as "3:06 PM" (no leading zero on the hour)."""
+    return f"{dt.hour % 12 or 12}:{dt.minute:02d} {'PM' if dt.hour >= 12 else 'AM'}"
+
+
+# strftime("%B") month names in the C locale (the generator never changes locale).
+_MONTH_NAMES: Final = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+
+def _format_month_year(year: int, month: int) -> str:
+    """
+    Format a month as "February 2026", the same text as strftime("%B %Y").
+    Raises ValueError for a month or year that datetime would reject.
+    """
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        raise ValueError(f"invalid year/month {year}-{month}")
+    return f"{_MONTH_NAMES[month - 1]} {year}"
+
+
 def index_meta_line(entry: dict) -> str:
     """Time · location · weather for index row."""
-    from datetime import datetime
-
     parts: list[str] = []
     creation = entry.get("creationDate", "")
     if creation:
         try:
-            dt = datetime.fromisoformat(creation.replace("Z", "+00:00"))
-            hour = dt.hour % 12 or 12
-            t = f"{hour}:{dt.minute:02d} {dt.strftime('%p')}"
+            t = _format_12h(parse_iso_datetime(creation))
         except (ValueError, TypeError):
             t = ""
         if t:
@@ -234,21 +298,23 @@ def get_title(entry: dict, *, default_title: str = "") -> str:
     if "text" not in entry or not entry["text"]:
         return default_title
 
-    lines = entry["text"].strip().split("\n")
     entry_title: str | None = None
 
-    for line in lines:
-        if line and not re.match(r"!\[\]", line):
+    for line in _iter_lines(entry["text"].strip()):
+        if line and not line.startswith("![]"):
             entry_title = line
             break
 
     if not entry_title:
         return default_title
 
+    # Strip the line once; everything below works on the stripped text.
+    stripped = entry_title.strip()
+
     # Strip markdown headers
-    if re.search(r"^#+\s*", entry_title.strip()) and not entry_title.strip().startswith("# ["):
-        entry_title = re.sub(r"^#+\s*", "", entry_title.strip())
+    if stripped.startswith("#") and not stripped.startswith("# ["):
+        stripped = stripped.lstrip("#").lstrip()
 
     # Sanitize for filename/display: remove disallowed characters
-    sanitized = re.sub(r'[\\/:\*?"<>|#^\[\]]', " ", entry_title).strip()
+    sanitized = _TITLE_DISALLOWED_RE.sub(" ", stripped).strip()
     return sanitized[:255] if sanitized else default_title
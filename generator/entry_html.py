@@ -1,37 +1,78 @@
 """Generate per-entry HTML pages for Day One entries using Jinja templates."""
 
-import json
+import calendar
 import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-
-from jinja2 import Environment, FileSystemLoader
+from typing import Callable
 
 from generator import entry_helpers
-from generator.archive_paths import output_dir_for_date_key
-from generator.nav_context import tab_urls_for_page
-from generator.text_to_html import entry_text_to_html
+from generator.archive_paths import existing_entry_json_names, output_dir_for_date_key, year_month_for_date_key
+from generator.index_html import index_row
+from generator.jinja_env import get_template
+from generator.json_cache import load_entry
+from generator.manifest import load_manifest_rows, record_first_photos
+from generator.nav_context import tab_urls_for_depth
+from generator.text_to_html import entry_text_to_html, get_first_photo_filename
+
+
+def _fast_iso_parts(iso_date: str) -> tuple[int, int, int, int, int] | None:
+    """
+    Return (year, month, day, hour, minute) for the usual Day One "YYYY-MM-DDTHH:MM:SSZ"
+    shape by slicing, or None so the caller falls back to a full ISO parse.
+    """
+    if len(iso_date) != 20 or iso_date[19] != "Z" or iso_date[10] != "T":
+        return None
+    if iso_date[4] != "-" or iso_date[7] != "-" or iso_date[13] != ":" or iso_date[16] != ":":
+        return None
+    try:
+        hour, minute, second = int(iso_date[11:13]), int(iso_date[14:16]), int(iso_date[17:19])
+        parts = (int(iso_date[:4]), int(iso_date[5:7]), int(iso_date[8:10]), hour, minute)
+    except ValueError:
+        return None
+    year, month, day = parts[0], parts[1], parts[2]
+    if hour > 23 or minute > 59 or second > 59 or year < 1 or not 1 <= month <= 12 or day < 1:
+        return None
+    if day > 28 and day > calendar.monthrange(year, month)[1]:
+        return None
+    return parts
 
 
+@lru_cache(maxsize=4096)
+def _format_day(year: int, month: int, day: int) -> str:
+    """Format a calendar day for display (e.g. Sat, 31 Jan 2026)."""
+    return datetime(year, month, day).strftime("%a, %d %b %Y")
+
+
+@lru_cache(maxsize=4096)
 def _format_creation_date(iso_date: str) -> str:
     """Format ISO date for display (e.g. Sat, 31 Jan 2026)."""
     if not iso_date:
         return ""
     try:
-        dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00"))
+        parts = _fast_iso_parts(iso_date)
+        if parts:
+            return _format_day(parts[0], parts[1], parts[2])
+        dt = entry_helpers.parse_iso_datetime(iso_date)
         return dt.strftime("%a, %d %b %Y")
     except (ValueError, TypeError):
         return iso_date[:10] if iso_date else ""
 
 
+@lru_cache(maxsize=4096)
 def _format_creation_time(iso_date: str) -> str:
     """Format ISO date time for display in entry timezone (e.g. 5:53 AM)."""
     if not iso_date:
         return ""
+    parts = _fast_iso_parts(iso_date)
+    if parts:
+        hour, minute = parts[3], parts[4]
+        return f"{hour % 12 or 12}:{minute:02d} {'PM' if hour >= 12 else 'AM'}"
     try:
-        dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00"))
-        hour = dt.hour % 12 or 12
-        return f"{hour}:{dt.minute:02d} {dt.strftime('%p')}"
+        return entry_helpers._format_12h(entry_helpers.parse_iso_datetime(iso_date))
     except (ValueError, TypeError):
         return ""
 
@@ -46,14 +87,15 @@ def _template_context(
 ) -> dict:
     """Build the Jinja template context for an entry."""
     creation_date = entry.get("creationDate", "")
+    creation_date_formatted = _format_creation_date(creation_date)
     title_raw = entry_helpers.get_title(entry)
-    title = f"{title_raw} · Journal" if title_raw else _format_creation_date(creation_date) + " · Journal"
+    title = f"{title_raw} · Journal" if title_raw else creation_date_formatted + " · Journal"
 
     loc = entry.get("location", {})
     latitude = str(loc["latitude"]) if "latitude" in loc else ""
     longitude = str(loc["longitude"]) if "longitude" in loc else ""
 
-    date_part = date_key.split("_")[0]
+    date_part = date_key.partition("_")[0]
     mm_dd = date_part[5:10] if len(date_part) >= 10 else ""
     # Entry is at entries/YYYY/MM/ — two levels up to entries/, then on-this-day/
     otd_url = f"../../on-this-day/{mm_dd}.html" if mm_dd else None
@@ -61,7 +103,7 @@ def _template_context(
     return {
         "title": title,
         "creation_date_iso": creation_date,
-        "creation_date_formatted": _format_creation_date(creation_date),
+        "creation_date_formatted": creation_date_formatted,
         "creation_time_formatted": _format_creation_time(creation_date),
         "location": entry_helpers.get_location(entry),
         "place_name": entry_helpers.get_place_name(entry),
@@ -87,60 +129,50 @@ def _template_context(
 
 def _load_manifest(manifest_path: Path) -> list[tuple[str, str]]:
     """Load manifest and return list of (date_key, html_path)."""
-    if not manifest_path.exists():
-        return []
-    with open(manifest_path, encoding="utf-8") as f:
-        data = json.load(f)
-    entries = data.get("entries", [])
-    # Manifest format: [uuid, date_key, html_path, creation_date] or legacy [date_key, html_path, creation_date]
-    result = []
-    for row in entries:
-        if len(row) >= 4:
-            result.append((row[1], row[2]))
-        elif len(row) >= 2:
-            result.append((row[0], row[1]))
-    return result
-
-
-def _load_manifest_full(manifest_path: Path) -> list[tuple[str, str, str]]:
-    """Load manifest and return list of (date_key, html_path, creation_date)."""
-    if not manifest_path.exists():
-        return []
-    with open(manifest_path, encoding="utf-8") as f:
-        data = json.load(f)
-    entries = data.get("entries", [])
-    result = []
-    for row in entries:
-        if len(row) >= 4:
-            result.append((row[1], row[2], row[3]))
-        elif len(row) >= 3:
-            result.append((row[0], row[1], row[2]))
-        elif len(row) >= 2:
-            result.append((row[0], row[1], row[0]))
-    return result
+    return [(date_key, html_path) for date_key, html_path, _ in load_manifest_rows(manifest_path)]
+
+
+def _manifest_index(manifest_entries: list[tuple[str, str]]) -> dict[str, int]:
+    """Map each date_key to its (first) position in manifest_entries."""
+    index: dict[str, int] = {}
+    for i, (dk, _) in enumerate(manifest_entries):
+        index.setdefault(dk, i)
+    return index
+
+
+def _relative_entry_url(html_path: str, year: str, month: str) -> str:
+    """
+    URL of another entry page (manifest html_path, e.g. 2026/02/2026-02-03.html) relative
+    to an entry page in entries/<year>/<month>/. Entry pages sit at a fixed depth, so
+    this is plain string work rather than os.path.relpath.
+    """
+    parts = html_path.split("/")
+    if len(parts) == 3:
+        if parts[0] != year:
+            return f"../../{html_path}"
+        if parts[1] != month:
+            return f"../{parts[1]}/{parts[2]}"
+        return parts[2]
+    if len(parts) == 1:
+        return f"../../{html_path}"
+    return posixpath.relpath(html_path, f"{year}/{month}")
 
 
 def _prev_next_urls(
     date_key: str,
     manifest_entries: list[tuple[str, str]],
-    current_output_dir: Path,
-    entries_dir: Path,
+    manifest_index: dict[str, int],
 ) -> tuple[str | None, str | None]:
     """Return (prev_url, next_url) as paths relative to current entry."""
-    for i, (dk, html_path) in enumerate(manifest_entries):
-        if dk == date_key:
-            prev_path = manifest_entries[i - 1][1] if i > 0 else None
-            next_path = manifest_entries[i + 1][1] if i + 1 < len(manifest_entries) else None
-            prev_url = None
-            next_url = None
-            if prev_path:
-                target = entries_dir / prev_path
-                prev_url = os.path.relpath(target, current_output_dir).replace("\\", "/")
-            if next_path:
-                target = entries_dir / next_path
-                next_url = os.path.relpath(target, current_output_dir).replace("\\", "/")
-            return (prev_url, next_url)
-    return (None, None)
+    i = manifest_index.get(date_key)
+    if i is None:
+        return (None, None)
+    prev_path = manifest_entries[i - 1][1] if i > 0 else None
+    next_path = manifest_entries[i + 1][1] if i + 1 < len(manifest_entries) else None
+    year, month = year_month_for_date_key(date_key)
+    prev_url = _relative_entry_url(prev_path, year, month) if prev_path else None
+    next_url = _relative_entry_url(next_path, year, month) if next_path else None
+    return (prev_url, next_url)
 
 
 def generate_entry_html(
@@ -149,24 +181,31 @@ def generate_entry_html(
     import_dir: Path,
     entries_dir: Path,
     manifest_path: Path,
-) -> None:
+    manifest_entries: list[tuple[str, str]] | None = None,
+    manifest_index: dict[str, int] | None = None,
+) -> str | None:
     """
     Generate an HTML file for a single entry.
     Copies photos to entries/YYYY/MM/photos/ and renders the template.
+    Pass manifest_entries (from _load_manifest) and manifest_index (from _manifest_index)
+    to skip re-reading and re-indexing the manifest for every page.
+    Returns the filename of the entry's first photo in photos/, or None.
     """
     entries_dir = Path(entries_dir)
     output_dir = output_dir_for_date_key(entries_dir, date_key)
     photos_dir = output_dir / "photos"
 
-    with open(entry_json_path, encoding="utf-8") as f:
-        entry = json.load(f)
+    entry = load_entry(entry_json_path)
 
     body_html = entry_text_to_html(entry, import_dir, photos_dir)
 
-    manifest_entries = _load_manifest(manifest_path)
-    prev_url, next_url = _prev_next_urls(date_key, manifest_entries, output_dir, entries_dir)
-    archive_root = entries_dir.parent
-    tab_urls = tab_urls_for_page(archive_root, output_dir)
+    if manifest_entries is None:
+        manifest_entries = _load_manifest(manifest_path)
+    if manifest_index is None:
+        manifest_index = _manifest_index(manifest_entries)
+    prev_url, next_url = _prev_next_urls(date_key, manifest_entries, manifest_index)
+    # Entry pages live at entries/YYYY/MM/, three levels below the archive root.
+    tab_urls = tab_urls_for_depth(3)
 
     context = _template_context(
         entry,
@@ -177,13 +216,98 @@ def generate_entry_html(
         tab_urls,
     )
 
-    templates_dir = Path(__file__).resolve().parent / "templates"
-    env = Environment(loader=FileSystemLoader(templates_dir))
-    template = env.get_template("entry.html")
+    template = get_template("entry.html")
     html = template.render(context)
 
     output_path = output_dir / f"{date_key}.html"
-    output_path.write_text(html, encoding="utf-8")
+    output_path.write_bytes(html.encode("utf-8"))
+    return get_first_photo_filename(entry, import_dir, photos_dir)
+
+
+# Below this many entry pages, rendering in-process beats starting a process pool.
+_MIN_PARALLEL_ENTRIES = 16
+
+# (manifest_path, manifest_entries, manifest_index) shared with each batch worker process.
+_worker_manifest: tuple[Path, list[tuple[str, str]], dict[str, int]] | None = None
+
+
+def _init_batch_worker(manifest_path: Path, manifest_entries: list[tuple[str, str]]) -> None:
+    """Process pool initializer: keep the parsed manifest for every job in this worker."""
+    global _worker_manifest
+    _worker_manifest = (manifest_path, manifest_entries, _manifest_index(manifest_entries))
+
+
+def _render_job(
+    job: dict,
+    manifest_path: Path,
+    manifest_entries: list[tuple[str, str]],
+    manifest_index: dict[str, int],
+) -> tuple[str | None, dict]:
+    """
+    Render one batch job; return (first photo filename, index row). The index row is
+    built here while the entry is already loaded, so the index needs no second read.
+    """
+    first_photo = generate_entry_html(
+        **job,
+        manifest_path=manifest_path,
+        manifest_entries=manifest_entries,
+        manifest_index=manifest_index,
+    )
+    entry = load_entry(job["entry_json_path"])
+    return first_photo, index_row(entry, job["date_key"], first_photo)
+
+
+def _render_batch_job(job: dict) -> tuple[str | None, dict]:
+    """Render one generate_entry_html_batch job inside a worker process."""
+    return _render_job(job, *_worker_manifest)
+
+
+def generate_entry_html_batch(
+    jobs: list[dict],
+    manifest_path: Path,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> dict[str, dict]:
+    """
+    Generate HTML for many entries, parsing the manifest only once.
+
+    Each job holds the generate_entry_html keyword arguments entry_json_path,
+    date_key, import_dir and entries_dir. Pages are independent, so large batches
+    are rendered in a process pool; on_progress(done, total) is called after each page.
+    Each page's first photo is recorded in the manifest once the batch is done.
+    Returns date_key -> index row for generate_index_html(index_rows=...).
+    """
+    manifest_path = Path(manifest_path)
+    manifest_entries = _load_manifest(manifest_path)
+    total = len(jobs)
+    workers = min(os.cpu_count() or 1, total)
+    first_photos: dict[str, str | None] = {}
+    index_rows: dict[str, dict] = {}
+
+    if workers > 1 and total >= _MIN_PARALLEL_ENTRIES:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(manifest_path, manifest_entries),
+        ) as executor:
+            # Hand out jobs in chunks so small pages don't pay one round trip each.
+            chunksize = max(1, min(32, total // (workers * 4)))
+            results = executor.map(_render_batch_job, jobs, chunksize=chunksize)
+            for done, (job, (first_photo, row)) in enumerate(zip(jobs, results), start=1):
+                first_photos[job["date_key"]] = first_photo
+                index_rows[job["date_key"]] = row
+                if on_progress:
+                    on_progress(done, total)
+    else:
+        manifest_index = _manifest_index(manifest_entries)
+        for done, job in enumerate(jobs, start=1):
+            first_photo, row = _render_job(job, manifest_path, manifest_entries, manifest_index)
+            first_photos[job["date_key"]] = first_photo
+            index_rows[job["date_key"]] = row
+            if on_progress:
+                on_progress(done, total)
+
+    record_first_photos(manifest_path, first_photos)
+    return index_rows
 
 
 def generate_all_entry_html(
@@ -193,26 +317,28 @@ def generate_all_entry_html(
 ) -> None:
     """
     Generate HTML for all entries in the manifest.
-    Entry JSONs must already exist in entries_dir.
+    Entry JSONs must already exist in entries_dir. Pages are rendered through
+    generate_entry_html_batch, so large archives use every core.
     """
     entries_dir = Path(entries_dir)
     manifest_path = Path(manifest_path)
     manifest_entries = _load_manifest(manifest_path)
 
+    # One directory listing per month instead of an exists() check per entry.
+    on_disk = existing_entry_json_names(entries_dir, [date_key for date_key, _ in manifest_entries])
+    jobs: list[dict] = []
     for date_key, _ in manifest_entries:
-        date_part = date_key.split("_")[0]
-        parts = date_part.split("-")
-        year, month = (parts[0], parts[1]) if len(parts) >= 2 else ("0000", "00")
+        year, month = year_month_for_date_key(date_key)
         entry_json_path = entries_dir / year / month / f"{date_key}.json"
 
-        if entry_json_path.exists():
-            generate_entry_html(
-                entry_json_path,
-                date_key,
-                import_dir,
-                entries_dir,
-                manifest_path,
-            )
+        if f"{date_key}.json" in on_disk:
+            jobs.append({
+                "entry_json_path": entry_json_path,
+                "date_key": date_key,
+                "import_dir": import_dir,
+                "entries_dir": entries_dir,
+            })
+    generate_entry_html_batch(jobs, manifest_path)
 
     archive_root = entries_dir.parent
     # The index page generation now lives in generator/index_html.py
@@ -1,30 +1,30 @@
 """Write canonical per-entry JSON files from Day One export."""
 
-import json
 from pathlib import Path
 
-from generator.archive_paths import assign_date_keys, output_dir_for_date_key
+from generator.archive_paths import assign_date_keys, output_dir_for_date_key, sort_by_creation_date
+from generator.json_io import read_json, write_json
 
 
-def write_entry_jsons(dayone_json_path: str | Path, archive_entries_dir: str | Path) -> None:
+def write_entry_jsons(dayone_json: str | Path | dict, archive_entries_dir: str | Path) -> None:
     """
     Copy each entry from the Day One export JSON to its canonical path.
+    dayone_json may be a path to the export or the already-parsed export dict.
     No modifications — exact copy per entry.
     """
-    path = Path(dayone_json_path)
     archive_entries_dir = Path(archive_entries_dir)
 
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
+    data = dayone_json if isinstance(dayone_json, dict) else read_json(dayone_json)
 
     entries_raw = data.get("entries", [])
-    entries_sorted = sorted(entries_raw, key=lambda e: e.get("creationDate", ""))
+    entries_sorted = sort_by_creation_date(entries_raw)
     rows = assign_date_keys(entries_sorted)
 
+    # Most entries share a YYYY/MM directory with the previous one; create each once.
+    seen_dirs: set[Path] = set()
     for date_key, entry in rows:
         out_dir = output_dir_for_date_key(archive_entries_dir, date_key)
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / f"{date_key}.json"
-
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(entry, f, indent=2, ensure_ascii=False)
+        if out_dir not in seen_dirs:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            seen_dirs.add(out_dir)
+        write_json(out_dir / f"{date_key}.json", entry)
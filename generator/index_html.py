@@ -1,46 +1,25 @@
 """Generate archive index (list view) HTML for Day One entries."""
 
-import json
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from zoneinfo import ZoneInfo
-
-from jinja2 import Environment, FileSystemLoader
 
 from generator import entry_helpers
+from generator.archive_paths import _UTC, _zone, existing_entry_json_names, year_month_for_date_key
+from generator.jinja_env import get_template
+from generator.json_cache import load_entry, map_entries
+from generator.manifest import load_manifest_rows
 from generator.nav_context import tab_urls_for_root
 from generator.text_to_html import get_first_photo_filename
 
 
-def _load_manifest_full(manifest_path: Path) -> list[tuple[str, str, str]]:
-    """Load manifest and return list of (date_key, html_path, creation_date)."""
-    if not manifest_path.exists():
-        return []
-    with open(manifest_path, encoding="utf-8") as f:
-        data = json.load(f)
-    entries = data.get("entries", [])
-    result: list[tuple[str, str, str]] = []
-    for row in entries:
-        if len(row) >= 4:
-            result.append((row[1], row[2], row[3]))
-        elif len(row) >= 3:
-            result.append((row[0], row[1], row[2]))
-        elif len(row) >= 2:
-            result.append((row[0], row[1], row[0]))
-    return result
-
-
-def _year_range_from_manifest(manifest_path: Path) -> str:
-    """Return 'YYYY – YYYY' from oldest to newest entry year, or '' if no entries."""
-    manifest_full = _load_manifest_full(manifest_path)
-    if not manifest_full:
-        return ""
-    years: list[int] = []
-    for date_key, _, _ in manifest_full:
-        date_part = date_key.split("_")[0]
-        if len(date_part) >= 4:
+def _year_range(manifest_full: list[tuple[str, str, str]]) -> str:
+    """Return 'YYYY – YYYY' from oldest to newest entry year in already-loaded rows, or ''."""
+    years: set[int] = set()
+    # Only the distinct four-character prefixes need parsing (one per year, in practice).
+    for head in {date_key[:4] for date_key, _, _ in manifest_full}:
+        if len(head) == 4 and "_" not in head:
             try:
-                years.append(int(date_part[:4]))
+                years.add(int(head))
             except ValueError:
                 pass
     if not years:
@@ -54,95 +33,134 @@ def _format_month_title(year_month: str) -> str:
         return year_month
     try:
         year, month = int(year_month[:4]), int(year_month[5:7])
-        return datetime(year, month, 1).strftime("%B %Y")
+        return entry_helpers._format_month_year(year, month)
     except (ValueError, TypeError):
         return year_month
 
 
+# strftime("%a") names in the C locale (the generator never changes locale), Monday first.
+_WEEKDAY_ABBR = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+@lru_cache(maxsize=4096)
+def _creation_parts(creation: str, tz_name: str | None) -> tuple[str, str, str]:
+    """
+    Return (YYYY-MM-DD, weekday, day of month) for an index row, in the entry's
+    timezone. Computed once per (creationDate, timezone); when the date cannot be
+    parsed, the date columns fall back to the first ten characters of creationDate.
+    """
+    if not creation:
+        return "", "", ""
+    try:
+        # Treat stored creationDate as UTC, then convert to entry's timezone if known.
+        dt = entry_helpers.parse_iso_datetime(creation).replace(tzinfo=_UTC)
+    except (ValueError, TypeError):
+        return creation[:10], "", creation[:10]
+    # Unknown timezone names fall back to the UTC interpretation; "UTC" needs no conversion.
+    tz = _zone(tz_name) if tz_name and tz_name != "UTC" else None
+    if tz is not None:
+        try:
+            dt = dt.astimezone(tz)
+        except (OverflowError, ValueError):
+            pass
+    day = f"{dt.day:02d}"
+    return f"{dt.year:04d}-{dt.month:02d}-{day}", _WEEKDAY_ABBR[dt.weekday()], day
+
+
+def index_row(entry: dict, date_key: str, first_photo: str | None) -> dict:
+    """
+    Index row for one entry: date columns, snippet, meta line and thumbnail.
+    entry_url is added by generate_index_html from the manifest html_path.
+    """
+    tz_name = (entry.get("location") or {}).get("timeZoneName") or entry.get("timeZone")
+    date_iso, dow, day = _creation_parts(entry.get("creationDate", ""), tz_name)
+    thumbnail_url = None
+    if first_photo:
+        year, month = year_month_for_date_key(date_key)
+        thumbnail_url = f"entries/{year}/{month}/photos/{first_photo}"
+    return {
+        "date_iso": date_iso,
+        "dow": dow,
+        "day": day,
+        "snippet": entry_helpers.index_snippet(entry),
+        "meta_line": entry_helpers.index_meta_line(entry),
+        "thumbnail_url": thumbnail_url,
+    }
+
+
+def _index_row_from_json(entries_dir: Path, import_dir: Path, date_key: str) -> dict:
+    """Index row for an entry read from its (existing) JSON file."""
+    year, month = year_month_for_date_key(date_key)
+    entry_json_path = entries_dir / year / month / f"{date_key}.json"
+    entry = load_entry(entry_json_path)
+    # Photos dir is inferred from this entry's location (same as its html/json).
+    photos_dir = entry_json_path.parent / "photos"
+    first_photo = get_first_photo_filename(entry, import_dir, photos_dir)
+    return index_row(entry, date_key, first_photo)
+
+
 def generate_index_html(
     import_dir: Path,
     archive_root: Path,
     entries_dir: Path,
     manifest_path: Path,
+    index_rows: dict[str, dict] | None = None,
 ) -> None:
     """
     Generate archive/index.html: list view with hero/compact header, tabs,
     sticky month titles, and entry rows (snippet, metadata, optional thumbnail).
+    index_rows (date_key -> index_row, e.g. from generate_entry_html_batch) supplies
+    rows for entries that were just rendered; only the others are read from disk.
     """
-    manifest_full = _load_manifest_full(manifest_path)
+    manifest_full = load_manifest_rows(manifest_path)
     if not manifest_full:
         return
 
     entries_dir = Path(entries_dir)
     import_dir = Path(import_dir)
+    index_rows = index_rows or {}
     # Newest first for list display
     manifest_full = list(reversed(manifest_full))
 
+    # Rows for entries not rendered in this run are read from disk, threaded for larger archives.
+    missing_keys = list(dict.fromkeys(k for k, _, _ in manifest_full if k not in index_rows))
+    if missing_keys:
+        # One directory listing per month instead of an exists() check per entry.
+        on_disk = existing_entry_json_names(entries_dir, missing_keys)
+        missing_keys = [k for k in missing_keys if f"{k}.json" in on_disk]
+    if missing_keys:
+        loaded = map_entries(
+            lambda date_key: _index_row_from_json(entries_dir, import_dir, date_key), missing_keys
+        )
+        index_rows = {**index_rows, **dict(zip(missing_keys, loaded))}
+
     # Group by year-month (YYYY-MM)
     months_map: dict[str, list[dict]] = {}
     for date_key, html_path, _ in manifest_full:
-        date_part = date_key.split("_")[0]
+        date_part = date_key.partition("_")[0]
         if len(date_part) >= 7:
             year_month = date_part[:7]
         else:
             year_month = "0000-00"
-        parts = date_part.split("-")
-        year, month = (parts[0], parts[1]) if len(parts) >= 2 else ("0000", "00")
-        entry_json_path = entries_dir / year / month / f"{date_key}.json"
-        if not entry_json_path.exists():
+        fields = index_rows.get(date_key)
+        if fields is None:
             continue
-        with open(entry_json_path, encoding="utf-8") as f:
-            entry = json.load(f)
-        # Photos dir is inferred from this entry's location (same as its html/json).
-        photos_dir = entry_json_path.parent / "photos"
-        first_photo = get_first_photo_filename(entry, import_dir, photos_dir)
-
-        creation = entry.get("creationDate", "")
-        dow = ""
-        day = ""
-        date_iso = ""
-        if creation:
-            tz_name = ((entry.get("location") or {}).get("timeZoneName") or entry.get("timeZone"))
-            try:
-                dt = datetime.fromisoformat(creation.replace("Z", "+00:00"))
-                # Treat stored creationDate as UTC, then convert to entry's timezone if known.
-                try:
-                    dt = dt.replace(tzinfo=ZoneInfo("UTC"))
-                    if tz_name:
-                        dt = dt.astimezone(ZoneInfo(tz_name))
-                except Exception:
-                    # If timezone lookup fails, fall back to naive/UTC interpretation.
-                    pass
-                dow = dt.strftime("%a")
-                day = dt.strftime("%d")
-                date_iso = dt.strftime("%Y-%m-%d")
-            except (ValueError, TypeError):
-                day = creation[:10] if creation else ""
-                date_iso = creation[:10] if creation else ""
-        row_date_iso = date_iso or (creation[:10] if creation else "")
-        entry_url = f"entries/{html_path}"
-        thumbnail_url = None
-        if first_photo:
-            thumbnail_url = f"entries/{year}/{month}/photos/{first_photo}"
-        row = {
-            "date_iso": row_date_iso,
-            "dow": dow,
-            "day": day,
-            "snippet": entry_helpers.index_snippet(entry),
-            "meta_line": entry_helpers.index_meta_line(entry),
-            "entry_url": entry_url,
-            "thumbnail_url": thumbnail_url,
-        }
+        row = dict(fields)
+        row["entry_url"] = f"entries/{html_path}"
         months_map.setdefault(year_month, []).append(row)
 
+    # Walking the manifest newest-first already inserts months newest-first. Only
+    # entries near a month boundary in different timezones can break that order
+    # (date_key is local, the manifest is sorted by UTC), so sort only then.
+    month_items = list(months_map.items())
+    if any(newer[0] < older[0] for newer, older in zip(month_items, month_items[1:])):
+        month_items.sort(reverse=True)
     months_list = [
         {"title": _format_month_title(ym), "entries": entries}
-        for ym, entries in sorted(months_map.items(), reverse=True)
+        for ym, entries in month_items
     ]
 
-    templates_dir = Path(__file__).resolve().parent / "templates"
-    env = Environment(loader=FileSystemLoader(templates_dir))
-    template = env.get_template("list.html")
+    template = get_template("list.html")
     tab_urls = tab_urls_for_root()
     context = {
         "css_path": "assets/css/",
@@ -150,11 +168,11 @@ def generate_index_html(
         "active_tab": "list",
         "tab_urls": tab_urls,
         "months": months_list,
-        "year_range": _year_range_from_manifest(manifest_path),
+        "year_range": _year_range(manifest_full),
         "photo_index_url": "entries/photo-index.json",
     }
     html = template.render(context)
     index_path = archive_root / "index.html"
     index_path.parent.mkdir(parents=True, exist_ok=True)
-    index_path.write_text(html, encoding="utf-8")
+    index_path.write_bytes(html.encode("utf-8"))
 
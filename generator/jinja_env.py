@@ -0,0 +1,45 @@
+"""Shared Jinja environment for the page generators.
+
+Every page (entries, index, calendar, media, on-this-day) renders from the same
+templates directory. One Environment per process means each template is compiled
+once and then reused, and auto_reload=False skips the per-render mtime check on
+the template file. Compiled bytecode is also kept on disk between runs, so a new
+process skips compiling from source; entries are keyed by a checksum of the
+template source, so edited templates are recompiled.
+"""
+
+from pathlib import Path
+
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from generator.json_io import dumps
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+def _bytecode_cache() -> BytecodeCache | None:
+    """
+    On-disk bytecode cache, or None when it cannot be set up.
+    With no directory argument Jinja uses a per-user temp folder that it creates with
+    mode 0700 and refuses to use if another user owns it, so no one else can plant
+    compiled templates for this process to run.
+    """
+    try:
+        return FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        return None
+
+
+_ENV = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    auto_reload=False,
+    cache_size=400,
+    bytecode_cache=_bytecode_cache(),
+)
+# Compact JSON for data-* attributes (e.g. calendar multi-entry cells).
+_ENV.filters["tojson_compact"] = lambda value: dumps(value, indent=False).decode("utf-8")
+
+
+def get_template(name: str) -> Template:
+    """Return the compiled template (compiled on first use, then cached)."""
+    return _ENV.get_template(name)
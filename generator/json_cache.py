@@ -0,0 +1,70 @@
+"""Cache of parsed manifest and entry JSON, shared by the generator stages of one build.
+
+Each stage (entry pages, index, calendar, media, OTD, map, search) used to parse
+manifest.json and the per-entry JSON files on its own. Files are cached by path and
+re-read only when their mtime or size changes, so a rewrite is always picked up.
+Returned objects are shared between callers; treat them as read-only.
+"""
+
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+from generator.json_io import read_json
+
+# str(path) -> ((mtime_ns, size), parsed JSON)
+_cache: dict[str, tuple[tuple[int, int], Any]] = {}
+
+# Below this many entries the thread pool costs more than it saves.
+_MIN_THREADED_ENTRIES = 64
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def load_json_cached(path: str | Path) -> Any:
+    """Return the parsed JSON at path, reusing the cached copy while the file is unchanged."""
+    key = os.fspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    data = read_json(key)
+    _cache[key] = (stamp, data)
+    return data
+
+
+def prime_cache(path: str | Path, data: Any) -> None:
+    """
+    Record data as the parsed content of path, which the caller has just written.
+    The next load of path then reuses data instead of reading the file back.
+    """
+    key = os.fspath(path)
+    st = os.stat(key)
+    _cache[key] = ((st.st_mtime_ns, st.st_size), data)
+
+
+def load_manifest(manifest_path: str | Path) -> dict:
+    """Return the parsed manifest.json ({"entries": [...]})."""
+    return load_json_cached(manifest_path)
+
+
+def load_entry(entry_json_path: str | Path) -> dict:
+    """Return a parsed per-entry JSON file."""
+    return load_json_cached(entry_json_path)
+
+
+def map_entries(func: Callable[[_T], _R], jobs: Sequence[_T]) -> list[_R]:
+    """
+    Return [func(job) for job in jobs], using threads for larger archives.
+    Per-entry work is mostly file reads and directory listings, which release the
+    GIL, so threads overlap the I/O. Results keep the order of jobs.
+    """
+    if len(jobs) < _MIN_THREADED_ENTRIES:
+        return [func(job) for job in jobs]
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, jobs))
@@ -0,0 +1,40 @@
+"""Fast JSON read/write helpers shared by the generator (orjson when available)."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder/decoder
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = True) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes.
+    Non-ASCII characters are written as-is; indent=True uses 2-space indentation,
+    indent=False the compact form without spaces.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def read_json(path: str | Path) -> Any:
+    """Read and parse a JSON file."""
+    return loads(Path(path).read_bytes())
+
+
+def write_json(path: str | Path, obj: Any, *, indent: bool = True) -> None:
+    """Serialize obj and write it to path as UTF-8 JSON."""
+    Path(path).write_bytes(dumps(obj, indent=indent))
@@ -1,40 +1,33 @@
 """Generate entries/location-index.json for the map page."""
 
 import json
-import re
-from datetime import datetime
+import os
+from collections.abc import Iterable
+from functools import lru_cache
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
-from generator.archive_paths import html_path_for_date_key
+from generator.archive_paths import _UTC, _zone, entry_json_files, html_path_for_date_key
 from generator import entry_helpers
+from generator.json_cache import load_entry
+from generator.json_io import write_json
+from generator.text_to_html import _first_photo_filename_from_photos_dir
 
-# Match ![](identifier) or ![](dayone-moment://identifier)
-_PHOTO_REF_RE = re.compile(r"!\[([^\]]*)\]\((?:dayone-moment://)?([^)]+)\)")
-
-
-def _first_photo_filename_from_photos_dir(entry: dict, photos_dir: Path) -> str | None:
-    """Resolve first image in entry text to a filename in photos_dir."""
-    text = entry.get("text", "") or ""
-    photos_meta = entry.get("photos", []) or []
-    match = _PHOTO_REF_RE.search(text)
-    if not match:
-        return None
-    identifier = match.group(2).strip()
-    by_id: dict[str, dict] = {p["identifier"]: p for p in photos_meta if "identifier" in p}
-    meta = by_id.get(identifier) if by_id else None
-    if not photos_dir.exists():
-        return None
-    files_in_dir = list(photos_dir.iterdir())
-    if meta and "md5" in meta:
-        md5_val = meta["md5"]
-        for f in files_in_dir:
-            if f.is_file() and (f.stem == md5_val or f.name == md5_val or md5_val in f.name):
-                return f.name
-    for f in files_in_dir:
-        if f.is_file() and identifier in (f.stem, f.name):
-            return f.name
-    return None
+
+@lru_cache(maxsize=4096)
+def _dow_day(creation: str, tz_name: str) -> tuple[str, str]:
+    """Return (dow, day) for a creationDate in tz_name; computed once per (date, timezone)."""
+    try:
+        dt = entry_helpers.parse_iso_datetime(creation)
+        dt = dt.replace(tzinfo=_UTC)
+        # Stored dates are already UTC, so only other zones need converting.
+        if tz_name and tz_name != "UTC":
+            tz = _zone(tz_name)
+            if tz is None:
+                raise ValueError(f"unknown timezone {tz_name!r}")
+            dt = dt.astimezone(tz)
+        return (dt.strftime("%a"), dt.strftime("%d"))
+    except Exception:
+        return ("", creation[:10].split("-")[-1] if creation else "")
 
 
 def _date_dow_day(entry: dict) -> tuple[str, str]:
@@ -43,36 +36,34 @@ def _date_dow_day(entry: dict) -> tuple[str, str]:
     if not creation:
         return ("", "")
     tz_name = ((entry.get("location") or {}).get("timeZoneName") or entry.get("timeZone")) or "UTC"
-    try:
-        dt = datetime.fromisoformat(creation.replace("Z", "+00:00"))
-        dt = dt.replace(tzinfo=ZoneInfo("UTC"))
-        if tz_name:
-            dt = dt.astimezone(ZoneInfo(tz_name))
-        return (dt.strftime("%a"), dt.strftime("%d"))
-    except Exception:
-        return ("", creation[:10].split("-")[-1] if creation else "")
+    return _dow_day(creation, tz_name)
 
 
-def build_location_index(entries_dir: Path) -> None:
+def build_location_index(entries_dir: Path, json_files: Iterable[os.DirEntry] | None = None) -> None:
     """
     Scan all entry JSONs under entries_dir, collect entries with location
     (latitude/longitude), and write entries/location-index.json.
     Output: lat, lng, date, path, place, snippet, meta_line, thumbnail_url?, dow, day.
     Sorted by creationDate descending. No clustering or aggregation.
+    json_files (from entry_json_files) lets a full build reuse one walk of entries_dir.
     """
     entries_dir = Path(entries_dir)
     out_path = entries_dir / "location-index.json"
 
     locations: list[dict] = []
-
-    for json_path in entries_dir.rglob("*.json"):
-        if json_path.name in ("manifest.json", "location-index.json", "photo-index.json"):
+    creation_dates: list[str] = []  # parallel to locations; sort key only, not written out
+
+    skip_names = {"manifest.json", "location-index.json", "photo-index.json"}
+    photos_dirs: dict[str, Path] = {}  # entry folder -> its photos folder
+    if json_files is None:
+        json_files = entry_json_files(entries_dir)
+    for file_entry in json_files:
+        if file_entry.name in skip_names:
             continue
-        date_key = json_path.stem
+        date_key = file_entry.name[:-5]
 
         try:
-            with open(json_path, encoding="utf-8") as f:
-                entry = json.load(f)
+            entry = load_entry(file_entry.path)
         except (OSError, json.JSONDecodeError):
             continue
 
@@ -80,22 +71,23 @@ def build_location_index(entries_dir: Path) -> None:
         if not isinstance(loc, dict) or "latitude" not in loc or "longitude" not in loc:
             continue
 
-        date_ymd = date_key.split("_")[0]
+        date_ymd = date_key.partition("_")[0]
         path = "entries/" + html_path_for_date_key(date_key)
         place = (loc.get("localityName") or loc.get("placeName") or "").strip()
         dow, day = _date_dow_day(entry)
         snippet = entry_helpers.index_snippet(entry)
         meta_line = entry_helpers.index_meta_line(entry)
 
-        photos_dir = json_path.parent / "photos"
+        # Entries of one month share a folder, so its photos Path is built once.
+        entry_dir = os.path.dirname(file_entry.path)
+        photos_dir = photos_dirs.get(entry_dir)
+        if photos_dir is None:
+            photos_dir = photos_dirs[entry_dir] = Path(entry_dir) / "photos"
         first_photo = _first_photo_filename_from_photos_dir(entry, photos_dir)
         thumbnail_url = None
-        if first_photo:
+        if first_photo and path.count("/") >= 2:
             # path is like entries/2026/02/2026-02-12.html; we need entries/2026/02/photos/filename
-            path_parts = path.replace("\\", "/").split("/")
-            if len(path_parts) >= 3:
-                base = "/".join(path_parts[:-1])
-                thumbnail_url = f"{base}/photos/{first_photo}"
+            thumbnail_url = f"{path.rsplit('/', 1)[0]}/photos/{first_photo}"
 
         locations.append({
             "lat": float(loc["latitude"]),
@@ -108,12 +100,10 @@ def build_location_index(entries_dir: Path) -> None:
             "thumbnail_url": thumbnail_url,
             "dow": dow,
             "day": day,
-            "_creationDate": entry.get("creationDate", ""),
         })
+        creation_dates.append(entry.get("creationDate", ""))
 
-    locations.sort(key=lambda x: x["_creationDate"], reverse=True)
-    for item in locations:
-        del item["_creationDate"]
+    order = sorted(range(len(locations)), key=creation_dates.__getitem__, reverse=True)
+    locations = [locations[i] for i in order]
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump({"locations": locations}, f, indent=2, ensure_ascii=False)
+    write_json(out_path, {"locations": locations})
@@ -1,66 +1,193 @@
 """Create or update entries/manifest.json from Day One export JSON.
 
 Manifest is keyed by entry UUID so the same entry keeps one row when date_key
-changes (e.g. after timezone fix). Row format: [uuid, date_key, html_path, creation_date].
+changes (e.g. after timezone fix). Row format: [uuid, date_key, html_path, creation_date]
+or, once the entry page has been generated, [uuid, date_key, html_path, creation_date,
+first_photo], where first_photo is the filename of the entry's first photo in
+entries/YYYY/MM/photos/ (null when it has none).
 """
 
-import json
 from pathlib import Path
 
-from generator.archive_paths import assign_date_keys, html_path_for_date_key
+from generator.archive_paths import assign_date_keys, html_path_for_date_key, sort_by_creation_date
+from generator.json_cache import load_manifest, prime_cache
+from generator.json_io import read_json, write_json
 
+# Known place name spelling quirks, corrected in entry and per-photo locations.
+PLACE_NAME_FIXES: dict[str, str] = {"Sanis": "SANI's"}
 
-def create_or_update(dayone_json_path: str | Path, manifest_path: str | Path) -> None:
+
+def _normalize_place_names(entry: dict) -> None:
+    """Apply PLACE_NAME_FIXES to the entry's location and each photo's location, in place."""
+    loc = entry.get("location")
+    if isinstance(loc, dict):
+        fixed = PLACE_NAME_FIXES.get((loc.get("placeName") or "").strip())
+        if fixed:
+            loc["placeName"] = fixed
+
+    # Captions use photo.location first, so fix those too.
+    for photo in entry.get("photos") or []:
+        photo_loc = photo.get("location")
+        if isinstance(photo_loc, dict):
+            fixed = PLACE_NAME_FIXES.get((photo_loc.get("placeName") or "").strip())
+            if fixed:
+                photo_loc["placeName"] = fixed
+
+
+def create_or_update(
+    dayone_json: str | Path | dict, manifest_path: str | Path, normalize: bool = False
+) -> dict:
     """
     Parse Day One export JSON and either create manifest.json or merge into existing.
+    dayone_json may be a path to the export or the already-parsed export dict.
+    With normalize=True, place names in PLACE_NAME_FIXES are corrected in the entries
+    (in place) during the same pass, so later stages sharing the dict see the fix.
     Merge is by entry UUID so one row per entry; date_key can change (e.g. timezone fix).
     Entries are ordered by creationDate (earliest first).
+    Returns the merged manifest dict ({"entries": [...]}); the file is only rewritten
+    when the merge changed it.
     """
-    path = Path(dayone_json_path)
     manifest_path = Path(manifest_path)
     manifest_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
+    data = dayone_json if isinstance(dayone_json, dict) else read_json(dayone_json)
 
     entries_raw = data.get("entries", [])
-    entries_sorted = sorted(entries_raw, key=lambda e: e.get("creationDate", ""))
+    entries_sorted = sort_by_creation_date(entries_raw)
     rows = assign_date_keys(entries_sorted)
-    new_rows = [
-        (
+    new_rows: list[tuple[str, str, str, str]] = []
+    for date_key, entry in rows:
+        if normalize:
+            _normalize_place_names(entry)
+        new_rows.append((
             entry.get("uuid", ""),
             date_key,
             html_path_for_date_key(date_key),
             entry.get("creationDate", ""),
-        )
-        for date_key, entry in rows
-    ]
+        ))
 
     # Load existing manifest: key by UUID (or date_key if UUID missing)
     existing_by_uuid: dict[str, tuple[str, str, str]] = {}  # key -> (date_key, html_path, creation_date)
+    first_photos: dict[str, list] = {}  # key -> [first_photo] for rows that recorded one
+    existing_entries: list = []
     if manifest_path.exists():
-        with open(manifest_path, encoding="utf-8") as f:
-            manifest = json.load(f)
-        for row in manifest.get("entries", []):
+        existing_entries = load_manifest(manifest_path).get("entries", [])
+        for row in existing_entries:
             if len(row) >= 4:
                 uuid, date_key, html_path, creation_date = row[0], row[1], row[2], row[3]
                 key = uuid or date_key
                 existing_by_uuid[key] = (date_key, html_path, creation_date)
+                if len(row) >= 5:
+                    first_photos[key] = row[4:5]
 
-    # Merge: one row per UUID (or per date_key if UUID missing); date_key can change
+    # Merge: one row per UUID (or per date_key if UUID missing); date_key can change.
+    # A recorded first photo is kept until the entry page is regenerated.
     for uuid, date_key, html_path, creation_date in new_rows:
         key = uuid or date_key
         existing_by_uuid[key] = (date_key, html_path, creation_date)
 
-    # Sort by creation_date (earliest first)
+    # Sort by creation_date (earliest first). The stored manifest is already in this
+    # order, so the sort is close to a single linear pass over it.
     sorted_items = sorted(
         existing_by_uuid.items(),
         key=lambda x: (x[1][2], x[1][0]),  # creation_date, then date_key for tiebreak
     )
     entries = [
-        [uuid, date_key, html_path, creation_date]
+        [uuid, date_key, html_path, creation_date, *first_photos.get(uuid, ())]
         for uuid, (date_key, html_path, creation_date) in sorted_items
     ]
 
-    with open(manifest_path, "w", encoding="utf-8") as f:
-        json.dump({"entries": entries}, f, indent=2, ensure_ascii=False)
+    manifest = {"entries": entries}
+    # Re-importing an unchanged export leaves the file (and its mtime) untouched.
+    if entries != existing_entries:
+        write_json(manifest_path, manifest)
+        # Later stages (and the next import's merge) reuse this dict instead of re-reading.
+        prime_cache(manifest_path, manifest)
+    return manifest
+
+
+def record_first_photos(manifest_path: str | Path, first_photos: dict[str, str | None]) -> None:
+    """
+    Store each entry's first photo filename (date_key -> filename or None) as the fifth
+    manifest column, so the calendar can pick thumbnails without reading entry JSONs.
+    """
+    if not first_photos:
+        return
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return
+    # Rows are edited in place, so read a private copy rather than the shared cached one.
+    manifest = read_json(manifest_path)
+    changed = False
+    for row in manifest.get("entries", []):
+        if len(row) < 4 or row[1] not in first_photos:
+            continue
+        first_photo = first_photos[row[1]]
+        if len(row) >= 5 and row[4] == first_photo:
+            continue
+        del row[4:]
+        row.append(first_photo)
+        changed = True
+    if changed:
+        write_json(manifest_path, manifest)
+        prime_cache(manifest_path, manifest)
+
+
+def manifest_rows(entries: list) -> list[tuple[str, str, str]]:
+    """
+    Normalize manifest rows to (date_key, html_path, creation_date).
+    Handles [uuid, date_key, html_path, creation_date, ...] as well as the legacy
+    [date_key, html_path, creation_date] and [date_key, html_path] rows.
+    """
+    if not entries:
+        return []
+    # Current manifests only hold 4+ field rows; read them without per-row branching.
+    if len(entries[0]) >= 4:
+        try:
+            return [(row[1], row[2], row[3]) for row in entries]
+        except IndexError:
+            pass  # mixed row formats; fall back to per-row handling
+    result: list[tuple[str, str, str]] = []
+    for row in entries:
+        if len(row) >= 4:
+            result.append((row[1], row[2], row[3]))
+        elif len(row) >= 3:
+            result.append((row[0], row[1], row[2]))
+        elif len(row) >= 2:
+            result.append((row[0], row[1], row[0]))
+    return result
+
+
+# str(path) -> (parsed manifest the rows came from, normalized rows)
+_rows_cache: dict[str, tuple[dict, list[tuple[str, str, str]]]] = {}
+
+
+def load_manifest_rows(manifest_path: str | Path) -> list[tuple[str, str, str]]:
+    """
+    Load manifest.json and return its rows as (date_key, html_path, creation_date).
+    The rows are built once per parsed manifest and shared between callers (index,
+    calendar, media, search); treat the returned list as read-only.
+    """
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return []
+    data = load_manifest(manifest_path)
+    key = str(manifest_path)
+    hit = _rows_cache.get(key)
+    if hit is not None and hit[0] is data:
+        return hit[1]
+    rows = manifest_rows(data.get("entries", []))
+    _rows_cache[key] = (data, rows)
+    return rows
+
+
+def first_photos_from_manifest(manifest_path: str | Path) -> dict[str, str | None]:
+    """Return date_key -> first photo filename (or None) for rows that recorded one."""
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {}
+    return {
+        row[1]: row[4]
+        for row in load_manifest(manifest_path).get("entries", [])
+        if len(row) >= 5
+    }
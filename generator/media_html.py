@@ -8,14 +8,16 @@ entries.
 
 from __future__ import annotations
 
-import json
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
-
-from generator.entry_html import _load_manifest_full
-from generator.index_html import _year_range_from_manifest
+from generator.archive_paths import existing_entry_json_names, year_month_for_date_key
+from generator.entry_helpers import _format_month_year, parse_iso_datetime
+from generator.index_html import _year_range
+from generator.jinja_env import get_template
+from generator.json_cache import load_entry, map_entries
+from generator.json_io import write_json
+from generator.manifest import load_manifest_rows
 from generator.nav_context import tab_urls_for_root
 from generator.text_to_html import _get_photo_meta_by_identifier, get_photo_filenames_for_entry
 
@@ -34,11 +36,16 @@ def _photo_date_parts(photo_meta: dict | None, entry: dict) -> tuple[str, str, s
 
     if not iso:
         return ("", "", "")
+    return _iso_date_parts(iso)
+
 
+@lru_cache(maxsize=4096)
+def _iso_date_parts(iso: str) -> tuple[str, str, str]:
+    """Return (iso_date, day_label, month_year) for one ISO date; photos often share one."""
     try:
-        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+        dt = parse_iso_datetime(iso)
         day_label = dt.strftime("%d")
-        month_year = dt.strftime("%B %Y")
+        month_year = _format_month_year(dt.year, dt.month)
         iso_out = dt.strftime("%Y-%m-%d")
         return (iso_out, day_label, month_year)
     except Exception:
@@ -49,47 +56,47 @@ def _photo_date_parts(photo_meta: dict | None, entry: dict) -> tuple[str, str, s
             try:
                 year = int(iso[:4])
                 month = int(iso[5:7])
-                dt2 = datetime(year, month, 1)
-                month_year = dt2.strftime("%B %Y")
+                month_year = _format_month_year(year, month)
             except Exception:
                 month_year = iso[:7]
         return (iso[:10], day_label, month_year)
 
 
+def _entry_photo_files(entries_dir: Path, date_key: str) -> tuple[dict, list[tuple[str, str]]]:
+    """Return (entry, [(identifier, filename), ...]) for one entry with an existing JSON file."""
+    year, month = year_month_for_date_key(date_key)
+    entry_json_path = entries_dir / year / month / f"{date_key}.json"
+    entry = load_entry(entry_json_path)
+    return entry, get_photo_filenames_for_entry(entry, entry_json_path.parent / "photos")
+
+
 def _build_photo_lists(
-    manifest_path: Path,
+    manifest_full: list[tuple[str, str, str]],
     entries_dir: Path,
 ) -> tuple[list[dict], list[dict]]:
     """
-    Build (photos_chrono, photos_grid) lists.
+    Build (photos_chrono, photos_grid) lists from already-loaded manifest rows.
 
     photos_chrono: oldest-first list for lightbox traversal.
     photos_grid: newest-first list for media grid display.
     """
-    manifest_full = _load_manifest_full(manifest_path)
     if not manifest_full:
         return ([], [])
 
     entries_dir = Path(entries_dir)
     photos_chrono: list[dict] = []
 
-    for date_key, html_path, _creation_date in manifest_full:
-        date_part = date_key.split("_")[0]
-        if len(date_part) < 7:
-            continue
-        parts = date_part.split("-")
-        year, month = (parts[0], parts[1]) if len(parts) >= 2 else ("0000", "00")
-        entry_json_path = entries_dir / year / month / f"{date_key}.json"
-        if not entry_json_path.exists():
-            continue
-
-        with open(entry_json_path, encoding="utf-8") as f:
-            entry = json.load(f)
+    rows = [row for row in manifest_full if len(row[0].partition("_")[0]) >= 7]
+    # One directory listing per month instead of an exists() check per entry.
+    on_disk = existing_entry_json_names(entries_dir, [row[0] for row in rows])
+    rows = [row for row in rows if f"{row[0]}.json" in on_disk]
+    # Reading entry JSONs and listing photo folders is I/O; overlap it across threads.
+    loaded = map_entries(lambda row: _entry_photo_files(entries_dir, row[0]), rows)
 
-        photos_dir = entry_json_path.parent / "photos"
-        id_and_filenames = get_photo_filenames_for_entry(entry, photos_dir)
+    for (date_key, html_path, _creation_date), (entry, id_and_filenames) in zip(rows, loaded):
         if not id_and_filenames:
             continue
+        year, month = year_month_for_date_key(date_key)
 
         photos_meta = entry.get("photos", []) or []
 
@@ -128,7 +135,8 @@ def generate_media_html(
     entries_dir = Path(entries_dir)
     archive_root = Path(archive_root)
 
-    photos_chrono, photos_grid = _build_photo_lists(manifest_path, entries_dir)
+    manifest_full = load_manifest_rows(manifest_path)
+    photos_chrono, photos_grid = _build_photo_lists(manifest_full, entries_dir)
     if not photos_chrono:
         # No photos; skip media.html but still write an empty index for robustness.
         photo_index_path = entries_dir / "photo-index.json"
@@ -136,13 +144,12 @@ def generate_media_html(
         return
 
     # Write global photo index (journal order, oldest-first) for lightbox traversal.
+    # Only the lightbox script reads it, so it is written compact.
     photo_index_path = entries_dir / "photo-index.json"
-    photo_index_path.write_text(json.dumps(photos_chrono, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(photo_index_path, photos_chrono, indent=False)
 
     # Render media.html with newest-first grid.
-    templates_dir = Path(__file__).resolve().parent / "templates"
-    env = Environment(loader=FileSystemLoader(templates_dir))
-    template = env.get_template("media.html")
+    template = get_template("media.html")
 
     tab_urls = tab_urls_for_root()
     context = {
@@ -150,13 +157,14 @@ def generate_media_html(
         "js_path": "assets/js/",
         "active_tab": "media",
         "tab_urls": tab_urls,
-        "year_range": _year_range_from_manifest(manifest_path),
+        "year_range": _year_range(manifest_full),
         "photos": photos_grid,
         "photo_index_url": "entries/photo-index.json",
     }
 
-    html = template.render(context)
     media_path = archive_root / "media.html"
     media_path.parent.mkdir(parents=True, exist_ok=True)
-    media_path.write_text(html, encoding="utf-8")
+    # Stream the page to disk instead of building the whole HTML string first.
+    with open(media_path, "wb") as f:
+        template.stream(context).dump(f, encoding="utf-8")
 
@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-import os
-from pathlib import Path
 from typing import Dict
 
 
@@ -21,19 +19,8 @@ def tab_urls_for_root() -> Dict[str, str]:
     return dict(_TAB_FILES)
 
 
-def tab_urls_for_page(archive_root: Path, output_dir: Path) -> Dict[str, str]:
-    """
-    Return tab URLs relative to a given output_dir.
-
-    archive_root is the directory that contains index.html, calendar.html, etc.
-    output_dir is the directory of the page being rendered.
-    """
-    archive_root = Path(archive_root)
-    output_dir = Path(output_dir)
-    urls: Dict[str, str] = {}
-    for key, filename in _TAB_FILES.items():
-        target = archive_root / filename
-        rel = os.path.relpath(target, output_dir).replace("\\", "/")
-        urls[key] = rel
-    return urls
+def tab_urls_for_depth(depth: int) -> Dict[str, str]:
+    """Return tab URLs for a page depth directories below the archive root."""
+    prefix = "../" * depth
+    return {key: prefix + filename for key, filename in _TAB_FILES.items()}
 
@@ -1,16 +1,17 @@
 """Generate On This Day (OTD) pages: one per calendar day (MM-DD), all 366 days."""
 
-import json
-import re
+import os
+from collections.abc import Collection, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from collections.abc import Collection
-
-from jinja2 import Environment, FileSystemLoader
 
 from generator import entry_helpers
-from generator.archive_paths import output_dir_for_date_key
+from generator.archive_paths import entry_json_files, output_dir_for_date_key
 from generator.entry_html import _format_creation_date, _format_creation_time
-from generator.nav_context import tab_urls_for_page
+from generator.jinja_env import get_template
+from generator.json_cache import load_entry
+from generator.nav_context import tab_urls_for_depth
 from generator.text_to_html import entry_text_to_html
 
 
@@ -31,37 +32,45 @@ def _all_mm_dd() -> list[str]:
 ALL_MM_DD = _all_mm_dd()
 
 
-def _scan_entries_by_mm_dd(entries_dir: Path) -> dict[str, list[tuple[str, str, Path]]]:
+def _scan_entries_by_mm_dd(
+    entries_dir: Path,
+    json_files: Iterable[os.DirEntry] | None = None,
+) -> dict[str, list[tuple[str, str, Path]]]:
     """
     Scan entries_dir for *.json (excluding on-this-day), return map:
     MM-DD -> [(year, date_key, json_path), ...] (unsorted).
+    json_files is a list from entry_json_files(entries_dir), if the caller already has one.
     """
     result: dict[str, list[tuple[str, str, Path]]] = {}
-    for json_path in entries_dir.rglob("*.json"):
-        try:
-            # Skip on-this-day folder
-            parts = json_path.relative_to(entries_dir).parts
-            if "on-this-day" in parts:
-                continue
-            if len(parts) < 3:
-                continue
-            year, month, filename = parts[0], parts[1], json_path.stem
-            date_part = filename.split("_")[0]
-            if len(date_part) != 10 or date_part[4] != "-" or date_part[7] != "-":
-                continue
-            mm_dd = date_part[5:]  # MM-DD
-            if mm_dd not in result:
-                result[mm_dd] = []
-            result[mm_dd].append((year, filename, json_path))
-        except (ValueError, IndexError):
+    root = os.fspath(entries_dir)
+    if json_files is None:
+        json_files = entry_json_files(entries_dir)
+    for file_entry in json_files:
+        filename = file_entry.name[:-5]  # strip ".json"
+        date_part = filename.partition("_")[0]
+        if len(date_part) != 10 or date_part[4] != "-" or date_part[7] != "-":
+            continue
+        # scandir paths are root + separator + relative path, so split the tail directly.
+        parts = file_entry.path[len(root):].lstrip(os.sep).split(os.sep)
+        if len(parts) < 3:
             continue
+        mm_dd = date_part[5:]  # MM-DD
+        if mm_dd not in result:
+            result[mm_dd] = []
+        result[mm_dd].append((parts[0], filename, Path(file_entry.path)))
     return result
 
 
+@lru_cache(maxsize=None)
+def _otd_photo_src(year: str, month: str) -> str:
+    """Return the img src prefix, relative to on-this-day/, for photos of entries in YYYY/MM/."""
+    return f'src="../{year}/{month}/photos/'
+
+
 def _body_html_for_otd(
     entry: dict,
     entry_output_dir: Path,
-    photo_src_prefix: str,
+    photo_src: str,
 ) -> str:
     """
     Return body HTML for an entry as shown on an OTD page.
@@ -70,22 +79,21 @@ def _body_html_for_otd(
     photos_dir = entry_output_dir / "photos"
     # Use entry's output dir as import_dir so photos are found there (no original zip needed)
     html = entry_text_to_html(entry, entry_output_dir, photos_dir)
-    # Rewrite photos/... to ../../YYYY/MM/photos/... relative to on-this-day/
-    html = re.sub(r'src="photos/', f'src="{photo_src_prefix}photos/', html)
-    return html
+    # Rewrite photos/... to ../YYYY/MM/photos/... relative to on-this-day/
+    return html.replace('src="photos/', photo_src)
 
 
 def _entry_context_for_otd(
     entry: dict,
     entry_output_dir: Path,
-    photo_src_prefix: str,
+    photo_src: str,
 ) -> dict:
     """Build per-entry context for OTD template (same fields as entry template)."""
     creation_date = entry.get("creationDate", "")
     loc = entry.get("location", {})
     latitude = str(loc["latitude"]) if "latitude" in loc else ""
     longitude = str(loc["longitude"]) if "longitude" in loc else ""
-    body_html = _body_html_for_otd(entry, entry_output_dir, photo_src_prefix)
+    body_html = _body_html_for_otd(entry, entry_output_dir, photo_src)
     return {
         "creation_date_iso": creation_date,
         "creation_date_formatted": _format_creation_date(creation_date),
@@ -109,16 +117,89 @@ def _format_otd_label_windows(mm_dd: str) -> str:
     try:
         month_num = int(mm_dd[:2], 10)
         day_num = int(mm_dd[3:5], 10)
-        months = [
-            "January", "February", "March", "April", "May", "June",
-            "July", "August", "September", "October", "November", "December",
-        ]
-        return f"{months[month_num - 1]} {day_num}"
+        return f"{entry_helpers._MONTH_NAMES[month_num - 1]} {day_num}"
     except (ValueError, TypeError, IndexError):
         return mm_dd
 
 
-def generate_otd_pages(entries_dir: Path, only_mm_dd: Collection[str] | None = None) -> None:
+# Page label, position and prev/next day (with wrap) of every calendar day,
+# computed once instead of per page.
+_OTD_LABELS = {mm_dd: _format_otd_label_windows(mm_dd) for mm_dd in ALL_MM_DD}
+_MM_DD_POSITION = {mm_dd: i for i, mm_dd in enumerate(ALL_MM_DD)}
+_PREV_MM_DD = dict(zip(ALL_MM_DD, ALL_MM_DD[-1:] + ALL_MM_DD[:-1]))
+_NEXT_MM_DD = dict(zip(ALL_MM_DD, ALL_MM_DD[1:] + ALL_MM_DD[:1]))
+
+
+# Below this many pages, rendering in-process beats starting a process pool.
+_MIN_PARALLEL_DAYS = 16
+
+
+def _write_otd_page(entries_dir: Path, mm_dd: str, rows: list[tuple[str, str, Path]]) -> None:
+    """Render and write entries/on-this-day/<mm_dd>.html from that day's scanned rows."""
+    prev_mm_dd = _PREV_MM_DD[mm_dd]
+    next_mm_dd = _NEXT_MM_DD[mm_dd]
+    prev_url = f"{prev_mm_dd}.html"
+    next_url = f"{next_mm_dd}.html"
+    prev_label = _OTD_LABELS[prev_mm_dd]
+    next_label = _OTD_LABELS[next_mm_dd]
+
+    day_label = _OTD_LABELS[mm_dd]
+    title = f"On {day_label} · Journal"
+
+    years_entries: list[tuple[str, list[dict]]] = []
+
+    if rows:
+        loaded: list[tuple[str, str, Path, dict]] = []
+        for year, date_key, json_path in rows:
+            try:
+                entry = load_entry(json_path)
+            except FileNotFoundError:
+                continue
+            loaded.append((year, date_key, json_path, entry))
+        loaded.sort(key=lambda x: (x[0], x[3].get("creationDate", "") or ""), reverse=True)
+
+        current_year: str | None = None
+        current_list: list[dict] = []
+        for year, date_key, json_path, entry in loaded:
+            if year != current_year:
+                if current_list:
+                    years_entries.append((current_year, current_list))
+                current_year = year
+                current_list = []
+            entry_output_dir = output_dir_for_date_key(entries_dir, date_key)
+            photo_src = _otd_photo_src(year, json_path.parent.name)
+            ctx = _entry_context_for_otd(entry, entry_output_dir, photo_src)
+            current_list.append(ctx)
+        if current_list and current_year:
+            years_entries.append((current_year, current_list))
+
+    context = {
+        "title": title,
+        "day_label": day_label,
+        "mm_dd": mm_dd,
+        "years_entries": years_entries,
+        "prev_url": prev_url,
+        "next_url": next_url,
+        "prev_label": prev_label,
+        "next_label": next_label,
+        # on-this-day pages live in entries/on-this-day/, two levels below the archive root.
+        "tab_urls": tab_urls_for_depth(2),
+        "css_path": "../../assets/css/",
+    }
+    html = get_template("on_this_day.html").render(context)
+    (entries_dir / "on-this-day" / f"{mm_dd}.html").write_bytes(html.encode("utf-8"))
+
+
+def _write_otd_job(job: tuple[Path, str, list[tuple[str, str, Path]]]) -> None:
+    """Write one On This Day page inside a worker process."""
+    _write_otd_page(*job)
+
+
+def generate_otd_pages(
+    entries_dir: Path,
+    only_mm_dd: Collection[str] | None = None,
+    json_files: Iterable[os.DirEntry] | None = None,
+) -> None:
     """
     Generate HTML pages under entries/on-this-day/.
 
@@ -126,81 +207,30 @@ def generate_otd_pages(entries_dir: Path, only_mm_dd: Collection[str] | None = N
     If only_mm_dd is provided, generate pages only for those MM-DD values.
     Entries are grouped by year (newest first), ordered by creationDate desc within year.
     Prev/next link to adjacent calendar days with wrap. No index.html.
+    Pages are independent, so larger runs are rendered in a process pool.
+    json_files (from entry_json_files) lets a full build reuse one walk of entries_dir.
     """
     entries_dir = Path(entries_dir)
     otd_dir = entries_dir / "on-this-day"
     otd_dir.mkdir(parents=True, exist_ok=True)
 
-    by_mm_dd = _scan_entries_by_mm_dd(entries_dir)
-    n = len(ALL_MM_DD)
-    archive_root = entries_dir.parent
-    css_path = "../../assets/css/"
-
-    templates_dir = Path(__file__).resolve().parent / "templates"
-    env = Environment(loader=FileSystemLoader(templates_dir))
-    template = env.get_template("on_this_day.html")
-
-    tab_urls = tab_urls_for_page(archive_root, otd_dir)
+    by_mm_dd = _scan_entries_by_mm_dd(entries_dir, json_files)
 
     if only_mm_dd is None:
         mm_dd_sequence = list(ALL_MM_DD)
     else:
-        allowed = {d for d in only_mm_dd if d in ALL_MM_DD}
+        allowed = {d for d in only_mm_dd if d in _MM_DD_POSITION}
         if not allowed:
             return
-        mm_dd_sequence = sorted(allowed, key=ALL_MM_DD.index)
-
-    for mm_dd in mm_dd_sequence:
-        i = ALL_MM_DD.index(mm_dd)
-        prev_mm_dd = ALL_MM_DD[(i - 1) % n]
-        next_mm_dd = ALL_MM_DD[(i + 1) % n]
-        prev_url = f"{prev_mm_dd}.html"
-        next_url = f"{next_mm_dd}.html"
-        prev_label = _format_otd_label_windows(prev_mm_dd)
-        next_label = _format_otd_label_windows(next_mm_dd)
-
-        day_label = _format_otd_label_windows(mm_dd)
-        title = f"On {day_label} · Journal"
-
-        rows = by_mm_dd.get(mm_dd, [])
-        years_entries: list[tuple[str, list[dict]]] = []
-
-        if rows:
-            loaded: list[tuple[str, str, Path, dict]] = []
-            for year, date_key, json_path in rows:
-                if not json_path.exists():
-                    continue
-                with open(json_path, encoding="utf-8") as f:
-                    entry = json.load(f)
-                loaded.append((year, date_key, json_path, entry))
-            loaded.sort(key=lambda x: (x[0], x[3].get("creationDate", "") or ""), reverse=True)
-
-            current_year: str | None = None
-            current_list: list[dict] = []
-            for year, date_key, json_path, entry in loaded:
-                if year != current_year:
-                    if current_list:
-                        years_entries.append((current_year, current_list))
-                    current_year = year
-                    current_list = []
-                entry_output_dir = output_dir_for_date_key(entries_dir, date_key)
-                photo_src_prefix = f"../{year}/{json_path.parent.name}/"
-                ctx = _entry_context_for_otd(entry, entry_output_dir, photo_src_prefix)
-                current_list.append(ctx)
-            if current_list and current_year:
-                years_entries.append((current_year, current_list))
-
-        context = {
-            "title": title,
-            "day_label": day_label,
-            "mm_dd": mm_dd,
-            "years_entries": years_entries,
-            "prev_url": prev_url,
-            "next_url": next_url,
-            "prev_label": prev_label,
-            "next_label": next_label,
-            "tab_urls": tab_urls,
-            "css_path": css_path,
-        }
-        html = template.render(context)
-        (otd_dir / f"{mm_dd}.html").write_text(html, encoding="utf-8")
+        mm_dd_sequence = sorted(allowed, key=_MM_DD_POSITION.__getitem__)
+
+    jobs = [(entries_dir, mm_dd, by_mm_dd.get(mm_dd, [])) for mm_dd in mm_dd_sequence]
+    workers = min(os.cpu_count() or 1, len(jobs))
+    if workers > 1 and len(jobs) >= _MIN_PARALLEL_DAYS:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, min(32, len(jobs) // (workers * 4)))
+            for _ in executor.map(_write_otd_job, jobs, chunksize=chunksize):
+                pass
+    else:
+        for job in jobs:
+            _write_otd_page(*job)
@@ -0,0 +1,16 @@
+"""Terminal progress bar shared by generate.py and utils/generate_again.py."""
+
+import sys
+
+
+def print_progress(idx: int, total: int, bar_width: int = 40) -> None:
+    """Simple terminal progress bar for entry HTML generation."""
+    if not total:
+        return
+    # Redraw only when the bar can visibly move (plus the final update).
+    if idx != total and idx % max(1, total // bar_width):
+        return
+    filled = int(bar_width * idx / total)
+    bar = "#" * filled + "-" * (bar_width - filled)
+    sys.stdout.write(f"\rEntries: [{bar}] {idx}/{total}")
+    sys.stdout.flush()
@@ -1,18 +1,123 @@
 """Convert entry text to HTML, resolving photo references and copying photos."""
 
 import html
+import os
 import re
 import shutil
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
 import markdown
 
+from generator.archive_paths import _zone
+from generator.entry_helpers import parse_iso_datetime
+
 
 # Match ![](identifier) or ![](dayone-moment://identifier)
 PHOTO_REF_RE = re.compile(r"!\[([^\]]*)\]\((?:dayone-moment://)?([^)]+)\)")
 
+# (file names in directory order, name/stem -> first such file,
+#  names joined with newlines for substring search, or None if a name contains one)
+_Listing = tuple[tuple[str, ...], dict[str, str], str | None]
+
+# str(dir) -> (dir mtime_ns, listing)
+_dir_files_cache: dict[str, tuple[int, _Listing]] = {}
+
+# A listing taken within this long of the directory's mtime is not cached: on file
+# systems with coarse timestamps a later write could leave the mtime unchanged.
+_DIR_CACHE_SETTLE_NS = 2_000_000_000
+
+
+# One Markdown converter per thread; building one (and loading nl2br) per entry is slow.
+_md_local = threading.local()
+
+
+def _markdown() -> markdown.Markdown:
+    """Return this thread's reusable Markdown converter (nl2br, HTML5 output)."""
+    md = getattr(_md_local, "md", None)
+    if md is None:
+        md = _md_local.md = markdown.Markdown(extensions=["nl2br"], output_format="html5")
+    return md
+
+
+def _stem(name: str) -> str:
+    """Path(name).stem without building a Path."""
+    i = name.rfind(".")
+    return name[:i] if 0 < i < len(name) - 1 else name
+
+
+def _dir_listing(directory: str | Path) -> _Listing:
+    """
+    Return (names, by_name, joined) for the regular files in directory: names in directory
+    order, by_name mapping each file name and stem to the first file in that order with it,
+    and joined for _name_containing. An unreadable directory gives ((), {}, "").
+    Listings are reused while the directory's mtime is unchanged, so photo folders that
+    are looked up once per entry or per photo are read from disk only once.
+    """
+    key = os.fspath(directory)
+    try:
+        mtime = os.stat(key).st_mtime_ns
+    except OSError:
+        return (), {}, ""
+    hit = _dir_files_cache.get(key)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    try:
+        with os.scandir(key) as it:
+            names = tuple(e.name for e in it if e.is_file())
+    except OSError:
+        return (), {}, ""
+    by_name: dict[str, str] = {}
+    for name in names:
+        by_name.setdefault(name, name)
+        by_name.setdefault(_stem(name), name)
+    joined = "\n".join(names)
+    listing = (names, by_name, None if joined.count("\n") != len(names) - 1 else joined)
+    if time.time_ns() - mtime > _DIR_CACHE_SETTLE_NS:
+        _dir_files_cache[key] = (mtime, listing)
+    return listing
+
+
+def _name_containing(listing: _Listing, needle: str) -> str | None:
+    """
+    Return the first name in listing (directory order) that contains needle, e.g. a
+    photo's md5. One str.find over the joined names replaces a Python loop over files.
+    """
+    names, _, joined = listing
+    if not names:
+        return None
+    if joined is None or "\n" in needle:
+        return next((name for name in names if needle in name), None)
+    i = joined.find(needle)
+    if i < 0:
+        return None
+    end = joined.find("\n", i)
+    return joined[joined.rfind("\n", 0, i) + 1:end if end >= 0 else len(joined)]
+
+
+def _copy_photo(src: Path, dest: Path, size: int) -> None:
+    """
+    Copy src to dest with its metadata, like shutil.copy2.
+    Where available, os.copy_file_range copies inside the kernel and lets file systems
+    that support it (Btrfs, XFS) share blocks instead of duplicating them; anything it
+    cannot handle falls back to shutil.copy2.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+                copied = 0
+                while copied < size:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                    if n == 0:
+                        raise OSError("copy_file_range stopped early")
+                    copied += n
+            shutil.copystat(src, dest)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dest)
+
 
 def _get_photo_meta_by_identifier(photos_meta: list[dict], identifier: str) -> dict | None:
     """Return the photo metadata dict matching the given identifier, if any."""
@@ -71,13 +176,16 @@ def _format_photo_datetime(photo_meta: dict | None, entry: dict) -> str:
 
     try:
         # Day One dates are typically UTC with trailing "Z"
-        dt_utc = datetime.fromisoformat(iso_date.replace("Z", "+00:00"))
-        dt_local = dt_utc.astimezone(ZoneInfo(tz_name))
+        dt_utc = parse_iso_datetime(iso_date)
+        tz = _zone(tz_name)
+        if tz is None:
+            raise ValueError(f"unknown timezone {tz_name!r}")
+        dt_local = dt_utc.astimezone(tz)
         return dt_local.strftime("%d %b %Y, %I:%M %p")
     except Exception:
         # Fallback: show the raw date without timezone conversion
         try:
-            dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00"))
+            dt = parse_iso_datetime(iso_date)
             return dt.strftime("%d %b %Y, %I:%M %p")
         except Exception:
             return iso_date
@@ -112,42 +220,49 @@ def _build_photo_caption(photo_meta: dict | None, entry: dict) -> str:
     return " · ".join(parts)
 
 
-def _find_photo_file(import_dir: Path, identifier: str, photos_meta: list[dict]) -> Path | None:
-    """Locate the photo file in the Day One export by identifier or md5."""
-    # Build lookup from photos metadata
-    by_id: dict[str, dict] = {}
-    for p in photos_meta:
-        if "identifier" in p:
-            by_id[p["identifier"]] = p
+def _photos_by_id(photos_meta: list[dict]) -> dict[str, dict]:
+    """Map identifier -> photo metadata (a repeated identifier keeps its last entry)."""
+    return {p["identifier"]: p for p in photos_meta if "identifier" in p}
 
-    meta = by_id.get(identifier) if by_id else None
 
-    # Search locations: Photos/, photos/, root (Day One export structure)
-    search_dirs: list[Path] = []
-    if import_dir.exists() and import_dir.is_dir():
-        for name in ["Photos", "photos", ""]:
-            d = import_dir / name if name else import_dir
-            if d.exists() and d.is_dir():
-                search_dirs.append(d)
-        if not search_dirs:
-            search_dirs.append(import_dir)
+def _photo_search_dirs(import_dir: Path) -> list[Path]:
+    """
+    Folders to search for export photos: Photos/, photos/, then the import root
+    (Day One export structure). One directory read finds the subfolders; an
+    import_dir that is missing or not a directory gives [].
+    """
+    try:
+        with os.scandir(import_dir) as it:
+            subdirs = {e.name for e in it if e.name in ("Photos", "photos") and e.is_dir()}
+    except OSError:
+        return []
+    search_dirs = [import_dir / name for name in ("Photos", "photos") if name in subdirs]
+    search_dirs.append(import_dir)
+    return search_dirs
+
+
+def _find_photo_file(import_dir: Path, identifier: str, by_id: dict[str, dict]) -> Path | None:
+    """
+    Locate the photo file in the Day One export by identifier or md5.
+    by_id is the entry's _photos_by_id map, built once per entry by the caller.
+    """
+    meta = by_id.get(identifier)
+
+    search_dirs = _photo_search_dirs(import_dir)
 
     # Try by md5 first (common in Day One exports)
     if meta and "md5" in meta:
         md5_val = meta["md5"]
-        ext = meta.get("type", "jpg").lower()
-        if ext == "jpeg":
-            ext = "jpg"
         for search_dir in search_dirs:
-            for f in search_dir.iterdir():
-                if f.is_file() and (f.stem == md5_val or f.name == md5_val or md5_val in f.name):
-                    return f
+            name = _name_containing(_dir_listing(search_dir), md5_val)
+            if name is not None:
+                return search_dir / name
 
     # Try by identifier
     for search_dir in search_dirs:
-        for f in search_dir.iterdir():
-            if f.is_file() and identifier in (f.stem, f.name):
-                return f
+        name = _dir_listing(search_dir)[1].get(identifier)
+        if name:
+            return search_dir / name
 
     return None
 
@@ -164,23 +279,39 @@ def entry_text_to_html(
     text = entry.get("text", "") or ""
     photos_meta = entry.get("photos", []) or []
 
+    by_id = _photos_by_id(photos_meta)
+
     # Build identifier -> rendered HTML map as we process
     refs: dict[str, str] = {}  # identifier -> full <figure> HTML
+    photos_dir_ready = False  # photos_output_dir is created once per entry, on first photo
 
     def replace_ref(m: re.Match) -> str:
+        nonlocal photos_dir_ready
         alt, identifier = m.group(1), m.group(2).strip()
         if identifier in refs:
             return refs[identifier]
 
-        src = _find_photo_file(import_dir, identifier, photos_meta)
-        if not src or not src.exists():
+        src = _find_photo_file(import_dir, identifier, by_id)
+        if not src:
+            return ""  # Drop broken refs
+        try:
+            src_st = src.stat()
+        except OSError:
             return ""  # Drop broken refs
 
-        photos_output_dir.mkdir(parents=True, exist_ok=True)
+        if not photos_dir_ready:
+            photos_output_dir.mkdir(parents=True, exist_ok=True)
+            photos_dir_ready = True
         dest_name = src.name
         dest_path = photos_output_dir / dest_name
-        if not dest_path.exists() or src.stat().st_mtime > dest_path.stat().st_mtime:
-            shutil.copy2(src, dest_path)
+        # Copy unless the destination is at least as new and the same size.
+        try:
+            dest_st = dest_path.stat()
+            stale = src_st.st_mtime_ns > dest_st.st_mtime_ns or src_st.st_size != dest_st.st_size
+        except OSError:
+            stale = True
+        if stale:
+            _copy_photo(src, dest_path, src_st.st_size)
 
         rel_path = f"photos/{dest_name}"
 
@@ -204,14 +335,10 @@ def entry_text_to_html(
         refs[identifier] = figure_html
         return figure_html
 
-    processed = PHOTO_REF_RE.sub(replace_ref, text)
+    # Most entries have no images; skip the regex pass when there is nothing to match.
+    processed = PHOTO_REF_RE.sub(replace_ref, text) if "![" in text else text
 
-    rendered_html = markdown.markdown(
-        processed,
-        extensions=["nl2br"],
-        output_format="html5",
-    )
-    return rendered_html
+    return _markdown().reset().convert(processed)
 
 
 def _first_photo_filename_from_photos_dir(
@@ -225,30 +352,22 @@ def _first_photo_filename_from_photos_dir(
     import_dir, so it works for entries from any import.
     """
     text = entry.get("text", "") or ""
-    photos_meta = entry.get("photos", []) or []
+    if "![" not in text:
+        return None  # No image refs (most entries): skip the regex and the listing
     match = PHOTO_REF_RE.search(text)
     if not match:
         return None
     identifier = match.group(2).strip()
-    by_id: dict[str, dict] = {}
-    for p in photos_meta:
-        if "identifier" in p:
-            by_id[p["identifier"]] = p
-    meta = by_id.get(identifier) if by_id else None
-    if not photos_dir.exists():
-        return None
-    files_in_dir = list(photos_dir.iterdir())
+    photos_meta = entry.get("photos", []) or []
+    meta = _photos_by_id(photos_meta).get(identifier) if photos_meta else None
+    listing = _dir_listing(photos_dir)
     # Match by md5 (Day One often names export files by md5)
     if meta and "md5" in meta:
-        md5_val = meta["md5"]
-        for f in files_in_dir:
-            if f.is_file() and (f.stem == md5_val or f.name == md5_val or md5_val in f.name):
-                return f.name
+        name = _name_containing(listing, meta["md5"])
+        if name is not None:
+            return name
     # Fallback: match by identifier in filename
-    for f in files_in_dir:
-        if f.is_file() and identifier in (f.stem, f.name):
-            return f.name
-    return None
+    return listing[1].get(identifier)
 
 
 def get_first_photo_filename(
@@ -268,12 +387,14 @@ def get_first_photo_filename(
         return name
     # Fallback: resolve from import (for current import before entry HTML is regenerated)
     text = entry.get("text", "") or ""
+    if "![" not in text:
+        return None
     photos_meta = entry.get("photos", []) or []
     match = PHOTO_REF_RE.search(text)
     if not match:
         return None
     identifier = match.group(2).strip()
-    src = _find_photo_file(import_dir, identifier, photos_meta)
+    src = _find_photo_file(import_dir, identifier, _photos_by_id(photos_meta))
     if not src:
         return None
     dest_name = src.name
@@ -297,16 +418,17 @@ def get_photo_filenames_for_entry(
     """
     text = entry.get("text", "") or ""
     photos_meta = entry.get("photos", []) or []
-    if not text or not photos_meta or not photos_dir.exists():
+    if "![" not in text or not photos_meta:
         return []
 
-    # Build lookup by identifier so we can reuse md5 where available.
-    by_id: dict[str, dict] = {}
-    for p in photos_meta:
-        if "identifier" in p:
-            by_id[p["identifier"]] = p
+    # A missing photos_dir lists as empty, so no separate exists() check is needed.
+    listing = _dir_listing(photos_dir)
+    files_in_dir, by_name, _ = listing
+    if not files_in_dir:
+        return []
 
-    files_in_dir = [f for f in photos_dir.iterdir() if f.is_file()]
+    # Build lookup by identifier so we can reuse md5 where available.
+    by_id = _photos_by_id(photos_meta)
     seen: set[str] = set()
     results: list[tuple[str, str]] = []
 
@@ -320,18 +442,11 @@ def get_photo_filenames_for_entry(
         filename: str | None = None
         # Prefer md5 match when available.
         if meta and "md5" in meta:
-            md5_val = meta["md5"]
-            for f in files_in_dir:
-                if f.stem == md5_val or f.name == md5_val or md5_val in f.name:
-                    filename = f.name
-                    break
+            filename = _name_containing(listing, meta["md5"])
 
         # Fallback: identifier in filename.
         if filename is None:
-            for f in files_in_dir:
-                if identifier in (f.stem, f.name):
-                    filename = f.name
-                    break
+            filename = by_name.get(identifier)
 
         if filename:
             results.append((identifier, filename))
@@ -1,10 +1,17 @@
 """ZIP file picker and extractor for Day One exports."""
 
+import fnmatch
+import os
+import shutil
 import zipfile
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog
 from pathlib import Path
 
+# Copy buffer for extracting members (photos and the export JSON are often several MB).
+_COPY_BUFSIZE = 256 * 1024
+
 
 def pick_zip_path():
     """Show a file dialog and return the selected ZIP path, or None if cancelled."""
@@ -18,10 +25,120 @@ def pick_zip_path():
     return path if path else None
 
 
+def find_export_json(import_dir: str | Path) -> Path | None:
+    """Return the first Day One JSON file directly inside import_dir, or None."""
+    try:
+        with os.scandir(import_dir) as it:
+            for entry in it:
+                if fnmatch.fnmatch(entry.name, "*.json") and entry.is_file():
+                    return Path(entry.path)
+    except OSError:
+        pass
+    return None
+
+
+def import_subdirs(imports_base: str | Path) -> list[Path]:
+    """Return the subdirectories of imports_base in sorted order ([] if it is missing)."""
+    try:
+        with os.scandir(imports_base) as it:
+            return sorted(Path(entry.path) for entry in it if entry.is_dir())
+    except OSError:
+        return []
+
+
+def find_import_dir(imports_base: str | Path) -> Path | None:
+    """
+    Return the first subdirectory under imports_base that contains
+    a Day One JSON export, or None if none are found.
+    """
+    for subdir in import_subdirs(imports_base):
+        if find_export_json(subdir):
+            return subdir
+    return None
+
+
+# Characters Windows does not allow in file names; ZipFile.extractall maps them to "_".
+_WINDOWS_ILLEGAL_NAME_CHARS = str.maketrans(':<>|"?*', "_" * 7)
+
+
+def _member_target(dest: Path, info: zipfile.ZipInfo) -> Path:
+    """
+    Return the output path for a member, sanitizing its name the way ZipFile.extractall
+    does: absolute paths and drive letters become relative, "." and ".." parts are
+    dropped, and on Windows illegal characters and trailing dots/spaces are rewritten.
+    """
+    arcname = info.filename.replace("/", os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_parts = ("", os.path.curdir, os.path.pardir)
+    parts = [x for x in arcname.split(os.path.sep) if x not in invalid_parts]
+    if os.path.sep == "\\":
+        parts = [x.translate(_WINDOWS_ILLEGAL_NAME_CHARS).rstrip(" .") for x in parts]
+        parts = [x for x in parts if x]
+    arcname = os.path.sep.join(parts)
+    if not arcname and not info.is_dir():
+        raise ValueError("Empty filename.")
+    return Path(os.path.normpath(os.path.join(dest, arcname)))
+
+
+def _extract_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path) -> None:
+    """Stream one member to disk with a large copy buffer."""
+    with zf.open(info, "r") as src, open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst, length=_COPY_BUFSIZE)
+
+
 def unzip_to_folder(zip_path: str, dest_folder: str) -> Path:
     """Extract the ZIP to the given destination folder. Returns the destination path."""
     dest = Path(dest_folder)
     dest.mkdir(parents=True, exist_ok=True)
     with zipfile.ZipFile(zip_path, "r") as zf:
-        zf.extractall(dest)
+        files: list[tuple[zipfile.ZipInfo, Path]] = []
+        for info in zf.infolist():
+            target = _member_target(dest, info)
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            files.append((info, target))
+
+        # The export JSON is what the next stages read, so extract it first.
+        json_members = [f for f in files if f[0].filename.lower().endswith(".json")]
+        other_members = [f for f in files if not f[0].filename.lower().endswith(".json")]
+        for info, target in json_members:
+            _extract_member(zf, info, target)
+
+        # zlib releases the GIL while inflating, so photos extract well in threads.
+        workers = min(8, os.cpu_count() or 1)
+        if workers > 1 and len(other_members) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for _ in pool.map(lambda f: _extract_member(zf, *f), other_members):
+                    pass
+        else:
+            for info, target in other_members:
+                _extract_member(zf, info, target)
     return dest
+
+
+_EXTRACTED_MARKER = ".extracted"
+
+
+def extract_if_changed(zip_path: str, dest_folder: str) -> bool:
+    """
+    Extract the ZIP into dest_folder unless it already holds this exact ZIP's contents.
+    A marker file records the ZIP's size and mtime; returns True if extraction ran.
+    Extraction writes over any existing folder contents; nothing there is deleted.
+    """
+    dest = Path(dest_folder)
+    zip_stat = Path(zip_path).stat()
+    stamp = f"{zip_stat.st_size}:{zip_stat.st_mtime_ns}"
+    marker = dest / _EXTRACTED_MARKER
+    try:
+        if marker.read_text(encoding="utf-8") == stamp:
+            return False
+    except OSError:
+        pass
+
+    unzip_to_folder(zip_path, dest)
+    marker.write_text(stamp, encoding="utf-8")
+    return True
@@ -1,5 +1,4 @@
 import http.server
-import socketserver
 import webbrowser
 import sys
 from pathlib import Path
@@ -55,7 +54,9 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                 super().log_request(code, size)
 
 try:
-    with socketserver.TCPServer(("127.0.0.1", PORT), Handler) as httpd:
+    # One thread per request, so the browser's parallel asset/photo requests are
+    # served concurrently (ThreadingHTTPServer uses daemon threads).
+    with http.server.ThreadingHTTPServer(("127.0.0.1", PORT), Handler) as httpd:
         url = f"http://127.0.0.1:{PORT}/index.html"
         print(f"Serving DayOne Archive at {url}")
         webbrowser.open(url)
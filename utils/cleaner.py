@@ -34,16 +34,27 @@ def main():
         shutil.rmtree(imports_dir)
         print(f"Removed {imports_dir}")
 
+    failed: list[tuple[str, OSError]] = []
     if entries_dir.exists():
-        for item in entries_dir.iterdir():
-            if item.is_file():
-                item.unlink()
-                print(f"Removed {item}")
-            else:
-                shutil.rmtree(item)
-                print(f"Removed {item}/")
-
-    print("Done. Clean slate restored.")
+        # Drop the whole tree in one call and recreate the (empty) entries folder,
+        # rather than removing and reporting each item individually. Failures (e.g. a
+        # file locked on Windows) are collected so they can be reported below.
+        def on_error(func, path, exc_info) -> None:
+            failed.append((path, exc_info[1]))
+
+        shutil.rmtree(entries_dir, onerror=on_error)
+        entries_dir.mkdir(parents=True, exist_ok=True)
+        if failed:
+            print(f"Could not delete {len(failed)} item(s) under {entries_dir}/:")
+            for path, err in failed:
+                print(f"  - {path}: {err}")
+        else:
+            print(f"Emptied {entries_dir}/")
+
+    if failed:
+        print("Done, but some files were left behind; close any program using them and run again.")
+    else:
+        print("Done. Clean slate restored.")
 
 
 if __name__ == "__main__":
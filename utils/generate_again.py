@@ -1,6 +1,5 @@
 """Regenerate the full static archive from existing _imports folder (no zip picker)."""
 
-import json
 import sys
 import time
 from pathlib import Path
@@ -10,50 +9,35 @@ _project_root = Path(__file__).resolve().parent.parent
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
-from generator import create_or_update, write_entry_jsons
-from generator.archive_paths import assign_date_keys, output_dir_for_date_key, prev_next_map
+from generator import create_or_update, find_export_json, import_subdirs, write_entry_jsons
+from generator.archive_paths import (
+    assign_date_keys,
+    build_key_table,
+    entry_json_files,
+    existing_entry_json_names,
+    manifest_keys,
+)
 from generator.calendar_html import generate_calendar_html
 from generator.media_html import generate_media_html
-from generator.entry_html import generate_entry_html
+from generator.entry_html import generate_entry_html_batch
 from generator.index_html import generate_index_html
+from generator.json_io import read_json
 from generator.location_index import build_location_index
 from generator.otd_html import generate_otd_pages
+from generator.progress import print_progress
 from utils.generate_search import build_search_index
 
 
 def _discover_imports(imports_base: Path) -> list[tuple[Path, Path]]:
     """Return list of (import_dir, dayone_json_path) for each subfolder that has a JSON."""
-    if not imports_base.exists():
-        return []
     result: list[tuple[Path, Path]] = []
-    for subdir in sorted(imports_base.iterdir()):
-        if not subdir.is_dir():
-            continue
-        jsons = list(subdir.glob("*.json"))
-        if jsons:
-            result.append((subdir, jsons[0]))
+    for subdir in import_subdirs(imports_base):
+        dayone_json = find_export_json(subdir)
+        if dayone_json:
+            result.append((subdir, dayone_json))
     return result
 
 
-def _date_key_to_import_dir(
-    imports_base: Path,
-) -> tuple[list[tuple[Path, Path]], dict[str, Path]]:
-    """
-    Discover all import (subdir, json) pairs and build date_key -> import_dir.
-    Later exports overwrite if same date_key appears in multiple.
-    """
-    pairs = _discover_imports(imports_base)
-    date_key_to_dir: dict[str, Path] = {}
-    for import_dir, json_path in pairs:
-        with open(json_path, encoding="utf-8") as f:
-            data = json.load(f)
-        entries_raw = data.get("entries", [])
-        entries_sorted = sorted(entries_raw, key=lambda e: e.get("creationDate", ""))
-        for date_key, _ in assign_date_keys(entries_sorted):
-            date_key_to_dir[date_key] = import_dir
-    return pairs, date_key_to_dir
-
-
 def main() -> None:
     total_start = time.perf_counter()
 
@@ -61,51 +45,48 @@ def main() -> None:
     entries_dir = _project_root / "archive" / "entries"
     manifest_path = entries_dir / "manifest.json"
 
-    pairs, date_key_to_import_dir = _date_key_to_import_dir(imports_base)
+    pairs = _discover_imports(imports_base)
     if not pairs:
         print("No Day One JSONs found under _imports. Add export folders there first.")
         return
 
     print(f"Found {len(pairs)} import(s) under _imports.")
 
-    # Rebuild manifest and entry JSONs from all imports (order: sorted by subdir name)
+    # Rebuild manifest and entry JSONs from all imports (order: sorted by subdir name),
+    # parsing each export once. date_key -> import_dir: later exports overwrite if the
+    # same date_key appears in several. Only the set of keys matters here, and a day's
+    # _N suffixes are the same set in any order, so the entries need no sorting.
+    date_key_to_import_dir: dict[str, Path] = {}
     for import_dir, json_path in pairs:
-        create_or_update(json_path, manifest_path)
-        write_entry_jsons(json_path, entries_dir)
+        data = read_json(json_path)
+        for date_key, _ in assign_date_keys(data.get("entries", [])):
+            date_key_to_import_dir[date_key] = import_dir
+        create_or_update(data, manifest_path, normalize=True)
+        write_entry_jsons(data, entries_dir)
         print(f"  Merged: {import_dir.name}")
 
     # Regenerate HTML for every entry in the manifest
-    prev_next = prev_next_map(manifest_path)
-    manifest_entries = list(prev_next.keys())
+    # Each date key once, in manifest order.
+    manifest_entries = list(dict.fromkeys(manifest_keys(manifest_path)))
 
     entries_html_start = time.perf_counter()
-    total_entries = len(manifest_entries)
-    bar_width = 40
-
-    for idx, date_key in enumerate(manifest_entries, start=1):
-        entry_json_dir = output_dir_for_date_key(entries_dir, date_key)
-        entry_json_path = entry_json_dir / f"{date_key}.json"
-        if not entry_json_path.exists():
+    key_table = build_key_table(manifest_entries, entries_dir)
+    existing_jsons = existing_entry_json_names(entries_dir, manifest_entries)
+    jobs: list[dict] = []
+    for date_key, _, _, entry_json_path, _ in key_table:
+        if entry_json_path.name not in existing_jsons:
             continue
         # Use the import dir this entry came from; fallback to archive photos dir if unknown
         photo_source = date_key_to_import_dir.get(date_key, entry_json_path.parent)
-        generate_entry_html(
-            entry_json_path=entry_json_path,
-            date_key=date_key,
-            import_dir=photo_source,
-            entries_dir=entries_dir,
-            manifest_path=manifest_path,
-        )
-
-        # Simple terminal progress bar for entry HTML generation
-        if total_entries:
-            progress = idx / total_entries
-            filled = int(bar_width * progress)
-            bar = "#" * filled + "-" * (bar_width - filled)
-            sys.stdout.write(f"\rEntries: [{bar}] {idx}/{total_entries}")
-            sys.stdout.flush()
-
-    if total_entries:
+        jobs.append({
+            "entry_json_path": entry_json_path,
+            "date_key": date_key,
+            "import_dir": photo_source,
+            "entries_dir": entries_dir,
+        })
+    index_rows = generate_entry_html_batch(jobs, manifest_path, on_progress=print_progress)
+
+    if jobs:
         sys.stdout.write("\n")
 
     # Regenerate index (use first import dir for thumbnail fallback; photos usually in archive)
@@ -113,7 +94,7 @@ def main() -> None:
     first_import_dir = pairs[0][0]
 
     index_html_start = time.perf_counter()
-    generate_index_html(first_import_dir, archive_root, entries_dir, manifest_path)
+    generate_index_html(first_import_dir, archive_root, entries_dir, manifest_path, index_rows=index_rows)
     index_html_end = time.perf_counter()
 
     generate_calendar_html(first_import_dir, archive_root, entries_dir, manifest_path)
@@ -124,11 +105,14 @@ def main() -> None:
         manifest_path=manifest_path,
     )
 
+    # On This Day and the map both scan every entry JSON; walk the tree once.
+    json_files = entry_json_files(entries_dir)
+
     otd_start = time.perf_counter()
-    generate_otd_pages(entries_dir)
+    generate_otd_pages(entries_dir, json_files=json_files)
     otd_end = time.perf_counter()
 
-    build_location_index(entries_dir)
+    build_location_index(entries_dir, json_files=json_files)
 
     search_index_path = entries_dir / "search-index.json"
     build_search_index(entries_dir, search_index_path, verbose=True)
@@ -136,8 +120,8 @@ def main() -> None:
     total_end = time.perf_counter()
 
     # Simple stats
-    prev_links = sum(1 for prev, _ in prev_next.values() if prev is not None)
-    next_links = sum(1 for _, nxt in prev_next.values() if nxt is not None)
+    # Every entry but the first has a prev link and every entry but the last a next link.
+    prev_links = next_links = max(0, len(manifest_entries) - 1)
     neighbour_links = prev_links + next_links
 
     print(f"Regenerated {len(manifest_entries)} entries and index.")
@@ -12,23 +12,7 @@ if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
 from generator.index_html import generate_index_html  # type: ignore  # noqa: E402
-
-
-def _pick_import_dir(imports_base: Path) -> Path | None:
-    """
-    Return the first subdirectory under imports_base that contains
-    a Day One JSON export, or None if none are found.
-    """
-    if not imports_base.exists():
-        return None
-
-    for subdir in sorted(imports_base.iterdir()):
-        if not subdir.is_dir():
-            continue
-        jsons = list(subdir.glob("*.json"))
-        if jsons:
-            return subdir
-    return None
+from generator.zip_handler import find_import_dir  # type: ignore  # noqa: E402
 
 
 def main() -> None:
@@ -44,7 +28,7 @@ def main() -> None:
 
     # Prefer an import directory (for thumbnail fallback), but gracefully
     # fall back to the archive root if none are present.
-    import_dir = _pick_import_dir(imports_base) or archive_root
+    import_dir = find_import_dir(imports_base) or archive_root
 
     print("Regenerating archive/index.html ...")
     start = time.perf_counter()
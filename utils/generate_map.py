@@ -1,6 +1,5 @@
 """Regenerate only the map data (entries/location-index.json) from existing entry JSONs."""
 
-import json
 import sys
 from pathlib import Path
 
@@ -9,6 +8,7 @@ _project_root = Path(__file__).resolve().parent.parent
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
+from generator.json_io import read_json
 from generator.location_index import build_location_index
 
 
@@ -23,8 +23,7 @@ def main() -> None:
 
     index_path = entries_dir / "location-index.json"
     if index_path.exists():
-        with open(index_path, encoding="utf-8") as f:
-            data = json.load(f)
+        data = read_json(index_path)
         count = len(data.get("locations", []))
         print(f"Regenerated {index_path.relative_to(_project_root)} with {count} location(s).")
     else: